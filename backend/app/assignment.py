@@ -0,0 +1,88 @@
+import heapq
+from sqlalchemy import func, select, update
+from app.models import Mentor, Student
+
+
+def balance(loads, students, capacities=None, default_capacity=None):
+    """Hands `students` out one at a time to the least loaded mentor with room left.
+
+    `loads` maps mentor_id to its current student count. Filling the lowest
+    level first is optimal for minimising the maximum (and the spread of) load,
+    in O(students * log mentors). Returns [(student_id, mentor_id)] and the
+    students no mentor had capacity for.
+    """
+    capacities = capacities or {}
+    heap = []
+    for mentor_id, load in loads.items():
+        capacity = capacities.get(mentor_id, default_capacity)
+        if capacity is None or load < capacity:
+            heap.append((load, mentor_id, capacity))
+    heapq.heapify(heap)
+
+    assignments = []
+    for i, student_id in enumerate(students):
+        if not heap:
+            return assignments, list(students[i:])
+        load, mentor_id, capacity = heap[0]
+        assignments.append((student_id, mentor_id))
+        if capacity is not None and load + 1 >= capacity:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (load + 1, mentor_id, capacity))
+    return assignments, []
+
+
+# Students per locking SELECT; keeps the IN list under SQLite's bound-parameter limit
+LOCK_CHUNK = 10_000
+
+
+async def plan(db, department=None, student_ids=None, capacities=None, default_capacity=None):
+    """Plans assignments of unassigned students; returns (loads, assignments, leftover).
+
+    `department` narrows the mentors who receive students, not the students:
+    students carry no department, so every unassigned student (or those in
+    `student_ids`) is spread over that department's mentors.
+    """
+    mentors = (
+        select(Mentor.mentor_id, func.count(Student.student_id))
+        .outerjoin(Student, Student.mentor_id == Mentor.mentor_id)
+        .group_by(Mentor.mentor_id)
+    )
+    if department:
+        mentors = mentors.where(Mentor.department == department)
+    loads = dict((await db.execute(mentors)).all())
+
+    students = select(Student.student_id).where(Student.mentor_id.is_(None)).order_by(Student.student_id)
+    if student_ids is not None:
+        students = students.where(Student.student_id.in_(student_ids))
+    students = list(await db.scalars(students))
+
+    assignments, leftover = balance(loads, students, capacities, default_capacity)
+    return loads, assignments, leftover
+
+
+async def commit(db, assignments):
+    """Writes `assignments` and returns the ones made.
+
+    Students someone else assigned since the plan are left alone and missing
+    from the result; locking the still unassigned ones first keeps that true
+    until the commit.
+    """
+    planned = [s for s, _ in assignments]
+    free = set()
+    for start in range(0, len(planned), LOCK_CHUNK):
+        free.update(await db.scalars(
+            select(Student.student_id)
+            .where(Student.student_id.in_(planned[start:start + LOCK_CHUNK]), Student.mentor_id.is_(None))
+            .with_for_update()
+        ))
+    assignments = [(s, m) for s, m in assignments if s in free]
+    if assignments:
+        await db.execute(
+            update(Student)
+            .where(Student.mentor_id.is_(None))
+            .execution_options(synchronize_session=None),
+            [{"student_id": s, "mentor_id": m} for s, m in assignments],
+        )
+    await db.commit()
+    return assignments
@@ -0,0 +1,333 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+import orjson
+from app.database import primary_session, reads_from_primary
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+PAGE_HEADERS = ("X-Next-Cursor", "X-Total-Count")
+
+
+class TTLCache:
+    """In-process LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, name, ttl, maxsize):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Bumped by every clear/delete_where; see set()
+        self.generation = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return MISSING
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, generation=None):
+        """Stores `value` unless the cache was invalidated since `generation` was read.
+
+        Read `generation` before loading the value: an invalidation that lands while
+        the load runs may have been for data the load already read.
+        """
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.invalidations += 1
+            self.generation += 1
+
+    def delete_where(self, predicate):
+        with self.lock:
+            stale = [key for key, (_, value) in self.entries.items() if predicate(value)]
+            for key in stale:
+                del self.entries[key]
+            self.invalidations += 1
+            self.generation += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "name": self.name,
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+async def cached_page(cache, request, response, load, db):
+    """Serves a (possibly paginated) list endpoint from `cache`, keyed by path and query.
+
+    `load(session)` always runs on the primary, since the entry is served to every
+    client until it expires. Clients that wrote recently skip the lookup: the
+    cache is per process, and other processes clear it only when the
+    invalidation reaches them over pub/sub (see SharedCache.clear_on).
+    """
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    if not reads_from_primary(request):
+        entry = cache.get(key)
+        if entry is not MISSING:
+            rows, headers = entry
+            response.headers.update(headers)
+            return rows
+
+    generation = cache.generation
+    async with primary_session(db) as session:
+        rows = await load(session)
+    headers = {h: response.headers[h] for h in PAGE_HEADERS if h in response.headers}
+    cache.set(key, (rows, headers), generation)
+    return rows
+
+
+class MemoryBackend:
+    """Stand-in for Redis: one process-wide store and channel shared by every SharedCache."""
+
+    def __init__(self):
+        self.store = {}
+        self.tags = {}
+        self.subscribers = {}
+        self.current = 0
+
+    async def generation(self):
+        return self.current
+
+    async def get(self, key):
+        entry = self.store.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    async def set(self, key, value, ttl, tags, generation):
+        if generation != self.current:
+            return
+        self.store[key] = (time.monotonic() + ttl, value)
+        for tag in tags:
+            self.tags.setdefault(tag, set()).add(key)
+
+    async def invalidate(self, tags):
+        self.current += 1
+        for tag in tags:
+            for key in self.tags.pop(tag, ()):
+                self.store.pop(key, None)
+
+    async def publish(self, channel, message):
+        for callback in self.subscribers.get(channel, []):
+            await callback(message)
+
+    async def listen(self, channel, callback):
+        self.subscribers.setdefault(channel, []).append(callback)
+
+    async def close(self):
+        pass
+
+    def health(self):
+        return {"channel": "memory", "listening": True, "connected": True, "errors": 0, "last_error": None}
+
+
+class RedisBackend:
+    """Values under pmms:cache:<key>, tag membership in Redis sets, invalidations over pub/sub.
+
+    pmms:cache:generation counts invalidations; set() stores nothing if it moved
+    since the caller read it (WATCH/MULTI), so a slow load cannot write back
+    data an invalidation already dropped.
+    """
+
+    prefix = "pmms:cache:"
+
+    def __init__(self, url):
+        import redis.asyncio as redis
+        self.redis = redis.from_url(url)
+        self.listener = None
+        self.generation_key = self.prefix + "generation"
+
+    async def generation(self):
+        return int(await self.redis.get(self.generation_key) or 0)
+
+    async def get(self, key):
+        return await self.redis.get(self.prefix + key)
+
+    async def set(self, key, value, ttl, tags, generation):
+        from redis.exceptions import WatchError
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(self.generation_key)
+                if int(await pipe.get(self.generation_key) or 0) != generation:
+                    return
+                pipe.multi()
+                pipe.set(self.prefix + key, value, ex=int(ttl))
+                for tag in tags:
+                    pipe.sadd(f"{self.prefix}tag:{tag}", self.prefix + key)
+                    pipe.expire(f"{self.prefix}tag:{tag}", int(ttl))
+                await pipe.execute()
+            except WatchError:
+                pass
+
+    async def invalidate(self, tags):
+        # Bump first: a set() between this and the delete sees the new generation
+        await self.redis.incr(self.generation_key)
+        tag_keys = [f"{self.prefix}tag:{tag}" for tag in tags]
+        keys = set()
+        for tag_key in tag_keys:
+            keys |= await self.redis.smembers(tag_key)
+        await self.redis.delete(*keys, *tag_keys)
+
+    async def publish(self, channel, message):
+        await self.redis.publish(channel, message)
+
+    async def listen(self, channel, callback):
+        from app.pubsub import Listener
+
+        self.listener = Listener(self.redis, channel, callback)
+        await self.listener.start()
+
+    async def close(self):
+        if self.listener is not None:
+            await self.listener.stop()
+        await self.redis.aclose()
+
+    def health(self):
+        if self.listener is None:
+            return {"channel": None, "listening": False, "connected": False, "errors": 0, "last_error": None}
+        return self.listener.health()
+
+
+class SharedCache:
+    """Two tiers: a short-lived per-process TTLCache in front of a backend shared by all replicas.
+
+    Entries carry entity tags ("project:12", "mentor:3"). invalidate() drops the
+    tagged keys from the backend and broadcasts the tags on `channel`, and every
+    replica evicts them from its local tier when the message arrives.
+
+    invalidate() runs after the write committed and never raises; if the
+    backend is down, other replicas serve the old entry until it expires.
+    """
+
+    channel = "pmms:cache:invalidate"
+
+    def __init__(self, backend, ttl, local_ttl, local_size):
+        self.backend = backend
+        self.ttl = ttl
+        self.local = TTLCache("shared-local", ttl=local_ttl, maxsize=local_size)
+        self.invalidate_errors = 0
+        # tag -> in-process caches every replica clears when the tag is invalidated
+        self.dependents = {}
+
+    async def start(self):
+        await self.backend.listen(self.channel, self.on_invalidate)
+
+    async def stop(self):
+        await self.backend.close()
+
+    def clear_on(self, tag, cache):
+        """Clears the TTLCache `cache` in every process whenever `tag` is invalidated."""
+        self.dependents.setdefault(tag, []).append(cache)
+
+    async def get_or_load(self, key, load, db, sticky=False):
+        """`load(session)` returns (value, tags); value must be JSON-serialisable.
+
+        The load runs on the primary (see primary_session) and is only stored if no
+        invalidation happened while it ran. `sticky` clients, who wrote recently,
+        skip the local tier: other replicas evict it only when the pub/sub message
+        arrives, while the backend was cleared before their write returned.
+        """
+        if not sticky:
+            entry = self.local.get(key)
+            if entry is not MISSING:
+                return entry[0]
+
+        local_generation = self.local.generation
+        raw = await self.backend.get(key)
+        if raw is not None:
+            value, tags = orjson.loads(raw)
+        else:
+            generation = await self.backend.generation()
+            async with primary_session(db) as session:
+                value, tags = await load(session)
+            tags = sorted(set(tags))
+            await self.backend.set(key, orjson.dumps([value, tags]), self.ttl, tags, generation)
+        self.local.set(key, (value, set(tags)), local_generation)
+        return value
+
+    async def invalidate(self, *tags):
+        tags = sorted({tag for tag in tags if tag})
+        try:
+            await self.backend.invalidate(tags)
+        except Exception as e:
+            self.invalidate_errors += 1
+            logger.warning("Could not invalidate %s in the shared cache: %r", ", ".join(tags), e)
+        self.evict_local(tags)
+        try:
+            await self.backend.publish(self.channel, orjson.dumps(tags))
+        except Exception as e:
+            self.invalidate_errors += 1
+            logger.warning("Could not broadcast the invalidation of %s: %r", ", ".join(tags), e)
+
+    async def on_invalidate(self, message):
+        self.evict_local(orjson.loads(message))
+
+    def evict_local(self, tags):
+        tags = set(tags)
+        self.local.delete_where(lambda entry: not entry[1].isdisjoint(tags))
+        for tag in tags & self.dependents.keys():
+            for cache in self.dependents[tag]:
+                cache.clear()
+
+
+def entity_tags(rows, *names):
+    """Tags like "student:4" for every id column in `names` across `rows`."""
+    return [f"{name}:{getattr(row, f'{name}_id')}" for row in rows for name in names
+            if getattr(row, f"{name}_id") is not None]
+
+
+# Mentor directory: read on every student/admin page load, written a few times a semester
+mentor_cache = TTLCache(
+    "mentors",
+    ttl=float(os.getenv("MENTOR_CACHE_TTL", "300")),
+    maxsize=int(os.getenv("MENTOR_CACHE_SIZE", "256")),
+)
+
+# Project detail and per-mentor / per-student project lists, shared across replicas.
+# CACHE_URL=redis://host:6379/0 in production; the default keeps everything in process.
+CACHE_URL = os.getenv("CACHE_URL", "memory://")
+shared_cache = SharedCache(
+    MemoryBackend() if CACHE_URL.startswith("memory://") else RedisBackend(CACHE_URL),
+    ttl=float(os.getenv("SHARED_CACHE_TTL", "300")),
+    local_ttl=float(os.getenv("SHARED_CACHE_LOCAL_TTL", "30")),
+    local_size=int(os.getenv("SHARED_CACHE_LOCAL_SIZE", "1024")),
+)
+
+# Mentor writes invalidate this tag, so every process drops its copy of the directory
+MENTORS_TAG = "mentors"
+shared_cache.clear_on(MENTORS_TAG, mentor_cache)
+
+CACHES = [mentor_cache, shared_cache.local]
@@ -0,0 +1,143 @@
+import zlib
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data):
+        # Sync-flush so streamed responses reach the client chunk by chunk
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data):
+        return self.compressor.compress(data) + self.compressor.flush()
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data):
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self, data):
+        return self.compressor.process(data) + self.compressor.finish()
+
+
+class CompressionMiddleware:
+    """gzip / brotli content negotiation with per-route thresholds and levels.
+
+    `routes` maps a path prefix to overrides of minimum_size, gzip_level and
+    brotli_quality (the longest matching prefix wins); mapping a prefix to None
+    turns compression off for it.
+    """
+
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=4, routes=None):
+        self.app = app
+        self.defaults = {
+            "minimum_size": minimum_size,
+            "gzip_level": gzip_level,
+            "brotli_quality": brotli_quality,
+        }
+        self.routes = sorted((routes or {}).items(), key=lambda r: len(r[0]), reverse=True)
+
+    def settings_for(self, path):
+        for prefix, overrides in self.routes:
+            if path.startswith(prefix):
+                return None if overrides is None else {**self.defaults, **overrides}
+        return self.defaults
+
+    def encoder_for(self, scope, settings):
+        header = ""
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                header = value.decode("latin-1")
+        accepted = accepted_encodings(header)
+        if brotli is not None and "br" in accepted:
+            return BrotliEncoder(settings["brotli_quality"])
+        if "gzip" in accepted:
+            return GzipEncoder(settings["gzip_level"])
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        settings = self.settings_for(scope["path"])
+        encoder = self.encoder_for(scope, settings) if settings else None
+        if encoder is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        compressing = None
+
+        async def send_compressed(message):
+            nonlocal start, compressing
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressing is None:
+                headers = {k.lower(): v for k, v in start["headers"]}
+                compressing = not (
+                    b"content-encoding" in headers
+                    or start["status"] in (204, 304)
+                    or (not more_body and len(body) < settings["minimum_size"])
+                )
+                if not compressing:
+                    await send(start)
+                    return await send(message)
+
+                raw_headers = [
+                    (k, v) for k, v in start["headers"]
+                    if k.lower() not in (b"content-length", b"etag")
+                ]
+                raw_headers.append((b"content-encoding", encoder.name.encode()))
+                raw_headers.append((b"vary", b"Accept-Encoding"))
+                etag = headers.get(b"etag")
+                if etag:
+                    # The encoded bytes differ, so a strong validator must be weakened
+                    raw_headers.append((b"etag", etag if etag.startswith(b"W/") else b"W/" + etag))
+                if not more_body:
+                    body = encoder.finish(body)
+                    raw_headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**start, "headers": raw_headers})
+                    return await send({"type": "http.response.body", "body": body})
+                await send({**start, "headers": raw_headers})
+
+            if not compressing:
+                return await send(message)
+
+            data = encoder.chunk(body) if more_body else encoder.finish(body)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,34 @@
+import hashlib
+import orjson
+from fastapi import HTTPException
+
+
+def etag_for(value):
+    """Weak validator hashed from the JSON of the body itself.
+
+    Any change to what the client would see moves it: same-second updates,
+    deletes, and joined columns such as a renamed student or mentor.
+    """
+    return f'W/"{hashlib.blake2b(orjson.dumps(value), digest_size=16).hexdigest()}"'
+
+
+def conditional(request, response, value):
+    """Answers If-None-Match for `value`, the body about to be returned; raises a 304 when it matches.
+
+    Call it on the cached value so validator and body always come from the same
+    load. Last-Modified is not sent: at one-second resolution, and blind to
+    deletes, it would let clients revalidate stale lists.
+    """
+    headers = {"ETag": etag_for(value), "Cache-Control": "no-cache"}
+    if not_modified(request, headers["ETag"]):
+        raise HTTPException(304, headers=headers)
+    response.headers.update(headers)
+    return value
+
+
+def not_modified(request, etag):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or etag.removeprefix("W/") in tags
@@ -1,24 +1,301 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event, exc, Select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import os
+import random
+import time
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+from app.pool import PoolStats, metered_pool_class, register
 
 load_dotenv()
 
-DATABASE_URL = (
+DATABASE_URL = os.getenv("DATABASE_URL") or (
     f"mysql+pymysql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
     f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
 )
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# DB_ASYNC=0 falls back to the sync driver, with each session call run in the threadpool
+DB_ASYNC = os.getenv("DB_ASYNC", "1").lower() in ("1", "true", "yes")
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_LIFO = os.getenv("DB_POOL_LIFO", "0").lower() in ("1", "true", "yes")
+
+# Comma separated replica URLs; GET endpoints read from these when set
+DB_REPLICA_URLS = [u.strip() for u in os.getenv("DB_REPLICA_URLS", "").split(",") if u.strip()]
+# After a write, the client reads from the primary this long (read-your-writes)
+DB_REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+STICKY_COOKIE = "pmms_primary_until"
+
+# Startup schema handling: "check" (one version query), "upgrade" (run migrations) or "off"
+DB_SCHEMA_MODE = os.getenv("DB_SCHEMA_MODE", "check")
+
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+
+def make_engine(url, name, is_async=False):
+    stats = PoolStats()
+    options = dict(
+        pool_pre_ping=True,
+        poolclass=metered_pool_class(is_async, stats),
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_use_lifo=DB_POOL_LIFO,
+    )
+    if is_async:
+        new_engine = create_async_engine(async_url(url), **options)
+    else:
+        new_engine = create_engine(url, **options)
+    if new_engine.dialect.name == "sqlite":
+        # SQLite ignores ON DELETE clauses unless this is switched on per connection
+        event.listen(getattr(new_engine, "sync_engine", new_engine), "connect", enable_sqlite_foreign_keys)
+    register(name, new_engine, stats)
+    return new_engine
+
+
+def make_unpooled_engine(url):
+    """For the few sync statements async mode runs (migrations, stats CLI): no idle connections kept."""
+    new_engine = create_engine(url, poolclass=NullPool)
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine, "connect", enable_sqlite_foreign_keys)
+    return new_engine
+
+
+def enable_sqlite_foreign_keys(dbapi_conn, record):
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+class RoutingSession(Session):
+    """Sends SELECTs of read-only sessions to a replica; everything else uses the primary bind."""
+
+    replicas = ()
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.replicas
+            and self.info.get("read_only")
+            and not self._flushing
+            and isinstance(clause, Select)
+        ):
+            return random.choice(self.replicas)
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+def routing_session_class(replicas):
+    return type("RoutingSession", (RoutingSession,), {"replicas": tuple(replicas)})
+
+
+engine = make_engine(DATABASE_URL, "primary") if not DB_ASYNC else make_unpooled_engine(DATABASE_URL)
+replica_engines = []
+session_slots = {}
+if not DB_ASYNC:
+    replica_engines = [
+        make_engine(url, f"replica-{i}") for i, url in enumerate(DB_REPLICA_URLS)
+    ]
+    # One slot per pooled connection, for sessions on the primary (False) and on the replicas (True)
+    session_slots = {
+        replica: asyncio.Semaphore(DB_POOL_SIZE + DB_MAX_OVERFLOW) for replica in (False, True)
+    }
+SessionLocal = sessionmaker(
+    class_=routing_session_class(replica_engines),
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    async_engine = make_engine(DATABASE_URL, "primary", is_async=True)
+    replica_engines = [
+        make_engine(url, f"replica-{i}", is_async=True)
+        for i, url in enumerate(DB_REPLICA_URLS)
+    ]
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        sync_session_class=routing_session_class(e.sync_engine for e in replica_engines),
+        autoflush=False, expire_on_commit=False
+    )
 
 Base = declarative_base()
 
+UPSERTS = {"mysql": mysql.insert, "postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def upsert(model, values, update):
+    """INSERT `values`, or apply `update` to the row with the same primary key."""
+    dialect = engine.dialect.name
+    stmt = UPSERTS[dialect](model).values(**values)
+    if dialect == "mysql":
+        # Assigned in the given order, which MySQL applies left to right
+        return stmt.on_duplicate_key_update(list(update.items()))
+    return stmt.on_conflict_do_update(
+        index_elements=list(model.__table__.primary_key.columns), set_=update
+    )
+
+
+class ThreadedSession:
+    """Gives a sync Session the AsyncSession interface used by the routers.
+
+    Every call blocks a threadpool thread, and the threadpool is larger than the
+    connection pool: once enough sessions sat in a thread waiting for a
+    connection, the sessions holding one could not get a thread to commit and
+    give it back. So a session takes one of `slots` (sized to the pool) before
+    its first call and returns it on close; the rest wait here, without a thread.
+    """
+
+    def __init__(self, session, slots):
+        self.sync_session = session
+        self.slots = slots
+        self.holds_slot = False
+
+    async def run(self, fn, *args, **kwargs):
+        if not self.holds_slot:
+            try:
+                await asyncio.wait_for(self.slots.acquire(), DB_POOL_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise exc.TimeoutError(f"No database session free after {DB_POOL_TIMEOUT:g}s") from None
+            self.holds_slot = True
+        return await run_in_threadpool(fn, *args, **kwargs)
+
+    @property
+    def info(self):
+        return self.sync_session.info
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await self.run(self.sync_session.execute, statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await self.run(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return await self.run(self.sync_session.scalars, statement, params, **kwargs)
+
+    async def stream(self, statement, params=None, **kwargs):
+        result = await self.run(
+            self.sync_session.execute,
+            statement.execution_options(stream_results=True),
+            params,
+            **kwargs
+        )
+        return ThreadedResult(result)
+
+    async def get(self, entity, ident, **kwargs):
+        return await self.run(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await self.run(self.sync_session.delete, instance)
+
+    async def refresh(self, instance, **kwargs):
+        await self.run(self.sync_session.refresh, instance, **kwargs)
+
+    async def flush(self):
+        await self.run(self.sync_session.flush)
+
+    async def commit(self):
+        await self.run(self.sync_session.commit)
+
+    async def rollback(self):
+        await self.run(self.sync_session.rollback)
+
+    async def close(self):
+        if not self.holds_slot:
+            # Never ran a statement, so holds no connection
+            self.sync_session.close()
+            return
+        try:
+            await run_in_threadpool(self.sync_session.close)
+        finally:
+            self.holds_slot = False
+            self.slots.release()
+
+
+class ThreadedResult:
+    """Server-side cursor counterpart of AsyncResult.partitions() for ThreadedSession."""
+
+    def __init__(self, result):
+        self.result = result
+
+    async def partitions(self, size=None):
+        while True:
+            rows = await run_in_threadpool(self.result.fetchmany, size)
+            if not rows:
+                break
+            yield rows
+
+
+def open_session(read_only=False):
+    info = {"read_only": read_only}
+    if DB_ASYNC:
+        return AsyncSessionLocal(info=info)
+    return ThreadedSession(SessionLocal(info=info), session_slots[read_only and bool(replica_engines)])
+
+
+def reads_from_primary(request: Request):
+    until = request.cookies.get(STICKY_COOKIE)
+    try:
+        return until is not None and float(until) > time.time()
+    except ValueError:
+        return False
+
+
+@asynccontextmanager
+async def primary_session(db):
+    """`db` itself unless it reads from a replica, otherwise a short-lived session on the primary.
+
+    For loads whose result outlives the request (cache fills): a lagging replica
+    would otherwise be served to every client until the entry expires.
+    """
+    if not (replica_engines and db.info.get("read_only")):
+        yield db
+        return
+    primary = open_session()
+    try:
+        yield primary
+    finally:
+        await primary.close()
+
+
 # ✅ Central DB dependency for all routers
-def get_db():
-    db = SessionLocal()
+async def get_db():
+    db = open_session()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+# Read-only endpoints: served by a replica unless this client wrote recently
+async def get_read_db(request: Request):
+    db = open_session(read_only=bool(replica_engines) and not reads_from_primary(request))
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
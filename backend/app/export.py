@@ -0,0 +1,41 @@
+import csv
+import io
+import orjson
+from fastapi.responses import StreamingResponse
+from app.database import open_session
+
+EXPORT_CHUNK = 1000
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+async def export_rows(stmt, fmt):
+    # The request's own session is closed before the body is sent, so the
+    # stream holds a session (and one server-side cursor) of its own
+    db = open_session(read_only=True)
+    try:
+        if fmt == "csv":
+            buf = io.StringIO()
+            csv.writer(buf).writerow(stmt.selected_columns.keys())
+            yield buf.getvalue()
+
+        # yield_per: without it the ORM prefetches every row on drivers lacking
+        # server-side cursors (pysqlite), however the result is consumed
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_CHUNK))
+        async for rows in result.partitions(EXPORT_CHUNK):
+            if fmt == "csv":
+                buf = io.StringIO()
+                csv.writer(buf).writerows(rows)
+                yield buf.getvalue()
+            else:
+                yield b"".join(orjson.dumps(row._asdict()) + b"\n" for row in rows)
+    finally:
+        await db.close()
+
+
+def export_response(stmt, fmt, name):
+    return StreamingResponse(
+        export_rows(stmt, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
@@ -0,0 +1,183 @@
+import argparse
+import asyncio
+import csv
+import io
+import orjson
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DataError, IntegrityError
+from starlette.concurrency import run_in_threadpool
+from app.database import async_engine, open_session
+from app.models import Mentor, Student
+
+try:
+    import openpyxl
+except ImportError:  # CSV only
+    openpyxl = None
+
+IMPORT_BATCH = 1000
+
+# Checked up front from the table definition: on MySQL in strict mode a value that does
+# not fit fails its whole batch, after earlier batches were committed
+STUDENT_COLUMNS = [c for c in Student.__table__.columns if not c.primary_key]
+REQUIRED = tuple(c.name for c in STUDENT_COLUMNS if not c.nullable)
+MAX_LENGTHS = {c.name: c.type.length for c in STUDENT_COLUMNS if getattr(c.type, "length", None)}
+
+
+def read_rows(fileobj, filename):
+    """Yields (row number, dict) from a CSV or XLSX file without loading it whole."""
+    if filename.lower().endswith(".xlsx"):
+        if openpyxl is None:
+            raise ValueError("XLSX import needs openpyxl; upload a CSV instead")
+        sheet = openpyxl.load_workbook(fileobj, read_only=True, data_only=True).active
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(h or "").strip().lower() for h in next(rows, ())]
+        for number, values in enumerate(rows, start=2):
+            yield number, {h: ("" if v is None else str(v).strip()) for h, v in zip(header, values)}
+        return
+
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = [h.strip().lower() for h in next(reader, [])]
+    for values in reader:
+        yield reader.line_num, {h: v.strip() for h, v in zip(header, values)}
+
+
+def batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def load_mentors(db):
+    mentors = (await db.execute(select(Mentor.mentor_id, Mentor.email))).all()
+    by_key = {str(mentor_id): mentor_id for mentor_id, _ in mentors}
+    by_key.update({email.lower(): mentor_id for mentor_id, email in mentors})
+    return by_key
+
+
+async def existing(db, column, values):
+    if not values:
+        return set()
+    return set(await db.scalars(select(column).where(column.in_(values))))
+
+
+async def validate(db, batch, mentors, seen_prns, seen_emails):
+    """Splits a batch into insertable rows and {"row", "errors"} reports."""
+    taken_prns = await existing(db, Student.prn, [r.get("prn") for _, r in batch if r.get("prn")])
+    taken_emails = await existing(db, Student.email, [r.get("email") for _, r in batch if r.get("email")])
+
+    valid, errors = [], []
+    for number, row in batch:
+        problems = [f"{field} is required" for field in REQUIRED if not row.get(field)]
+        problems += [
+            f"{field} is longer than {limit} characters"
+            for field, limit in MAX_LENGTHS.items() if len(row.get(field) or "") > limit
+        ]
+        prn, email = row.get("prn"), row.get("email")
+        if email and "@" not in email:
+            problems.append("email is not valid")
+        if prn and (prn in taken_prns or prn in seen_prns):
+            problems.append(f"prn {prn} already exists")
+        if email and (email in taken_emails or email in seen_emails):
+            problems.append(f"email {email} already exists")
+
+        # Mentor by email or mentor_id, in a "mentor" (or "mentor_email") column
+        mentor_key = (row.get("mentor") or row.get("mentor_email") or row.get("mentor_id") or "").lower()
+        mentor_id = None
+        if mentor_key:
+            mentor_id = mentors.get(mentor_key)
+            if mentor_id is None:
+                problems.append(f"mentor {mentor_key} not found")
+
+        if problems:
+            errors.append({"row": number, "errors": problems})
+            continue
+        seen_prns.add(prn)
+        seen_emails.add(email)
+        valid.append((number, {
+            "name": row["name"],
+            "prn": prn,
+            "email": email,
+            "password": row["password"],
+            "mentor_id": mentor_id,
+            "github_link": row.get("github_link") or None,
+        }))
+    return valid, errors
+
+
+async def insert_batch(db, rows):
+    """One executemany INSERT and commit; row by row if a concurrent write collides.
+
+    Row by row as well if the database rejects a value validate() let through,
+    so that row is reported instead of failing the rest of the import.
+    """
+    try:
+        await db.execute(insert(Student), [values for _, values in rows])
+        await db.commit()
+        return len(rows), []
+    except (IntegrityError, DataError):
+        await db.rollback()
+
+    inserted, errors = 0, []
+    for number, values in rows:
+        try:
+            await db.execute(insert(Student), [values])
+            await db.commit()
+            inserted += 1
+        except IntegrityError:
+            await db.rollback()
+            errors.append({"row": number, "errors": ["prn or email already exists"]})
+        except DataError as e:
+            await db.rollback()
+            errors.append({"row": number, "errors": [f"rejected by the database: {e.orig}"]})
+    return inserted, errors
+
+
+async def import_students(db, fileobj, filename, batch_size=IMPORT_BATCH):
+    mentors = await load_mentors(db)
+    seen_prns, seen_emails = set(), set()
+    inserted, errors = 0, []
+
+    # Parsing is blocking file IO, so each batch is read in the threadpool
+    chunks = batches(read_rows(fileobj, filename), batch_size)
+    while (batch := await run_in_threadpool(next, chunks, None)) is not None:
+        valid, batch_errors = await validate(db, batch, mentors, seen_prns, seen_emails)
+        errors.extend(batch_errors)
+        if valid:
+            count, insert_errors = await insert_batch(db, valid)
+            inserted += count
+            errors.extend(insert_errors)
+
+    return {"inserted": inserted, "failed": len(errors), "errors": errors}
+
+
+async def import_file(path):
+    db = open_session()
+    try:
+        with open(path, "rb") as fileobj:
+            return await import_students(db, fileobj, path)
+    finally:
+        await db.close()
+        if async_engine is not None:
+            # Pooled async connections would otherwise keep the CLI from exiting
+            await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.importer")
+    parser.add_argument("path", help="CSV or XLSX with name, prn, email, password[, mentor, github_link]")
+    args = parser.parse_args()
+
+    result = asyncio.run(import_file(args.path))
+    for error in result["errors"]:
+        print(orjson.dumps(error).decode())
+    print(f"Imported {result['inserted']} students, {result['failed']} rows failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,33 @@
-from fastapi import FastAPI
-from app.database import Base, engine
-from app.routers import admin, student, faculty, projects, messages
+import os
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+from app.database import replica_engines, DB_REPLICA_STICKY_SECONDS, STICKY_COOKIE, DB_SCHEMA_MODE
+from app import migrations
+from app.cache import shared_cache
+from app.realtime import hub
+from app.compression import CompressionMiddleware
+from app.routers import admin, student, faculty, projects, messages, system
 from fastapi.middleware.cors import CORSMiddleware
 
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # At startup rather than import, so importing the app never touches the database
+    if DB_SCHEMA_MODE == "upgrade":
+        migrations.upgrade()
+    elif DB_SCHEMA_MODE == "check":
+        migrations.check()
+    # Subscribes to the cache invalidation and realtime event channels for the life of the process
+    await shared_cache.start()
+    await hub.start()
+    yield
+    await hub.stop()
+    await shared_cache.stop()
+
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,10 +35,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],
+)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESS_MIN_SIZE", "1024")),
+    gzip_level=int(os.getenv("COMPRESS_GZIP_LEVEL", "6")),
+    brotli_quality=int(os.getenv("COMPRESS_BROTLI_QUALITY", "4")),
+    routes={
+        # Exports stream for minutes; trade ratio for CPU
+        "/admin/export": {"minimum_size": 0, "gzip_level": 1, "brotli_quality": 1},
+        "/system": None,
+    },
 )
 
+
+@app.middleware("http")
+async def stick_to_primary_after_write(request: Request, call_next):
+    response = await call_next(request)
+    if (
+        replica_engines
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            STICKY_COOKIE,
+            str(time.time() + DB_REPLICA_STICKY_SECONDS),
+            max_age=int(DB_REPLICA_STICKY_SECONDS) + 1,
+            httponly=True,
+        )
+    return response
+
+
 app.include_router(admin.router, prefix="/admin")
 app.include_router(student.router, prefix="/student")
 app.include_router(faculty.router, prefix="/faculty")
 app.include_router(projects.router, prefix="/projects")
 app.include_router(messages.router, prefix="/messages")
+app.include_router(system.router, prefix="/system")
@@ -0,0 +1,463 @@
+import argparse
+import os
+from contextlib import contextmanager
+from sqlalchemy import (
+    BigInteger, Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+    func, inspect, insert, select, text
+)
+from sqlalchemy.exc import SQLAlchemyError
+from app.database import engine
+from app import receipts, stats
+
+# Kept off Base.metadata so create_all() never treats it as a model table
+schema_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    schema_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, server_default=func.now()),
+)
+
+MIGRATIONS = []
+
+LOCK_NAME = "pmms_migrations"
+# pg_advisory_lock takes a bigint key rather than a name
+LOCK_KEY = 0x706d6d73
+LOCK_TIMEOUT = int(os.getenv("MIGRATION_LOCK_TIMEOUT", "600"))
+
+
+def migration(version, description):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+def index(table, name, *columns):
+    """A frozen index definition; CREATE INDEX only needs the table and column names."""
+    stub = Table(table, MetaData(), *(Column(c, Integer) for c in columns))
+    return Index(name, *(stub.c[c] for c in columns))
+
+
+def create_index(conn, index):
+    if index.name in {ix["name"] for ix in inspect(conn).get_indexes(index.table.name)}:
+        return
+    if conn.dialect.name == "mysql":
+        # Fail instead of silently falling back to a table-locking copy
+        columns = ", ".join(f"`{c.name}`" for c in index.columns)
+        conn.exec_driver_sql(
+            f"ALTER TABLE `{index.table.name}` ADD INDEX `{index.name}` ({columns}), "
+            "ALGORITHM=INPLACE, LOCK=NONE"
+        )
+    else:
+        index.create(conn)
+
+
+def drop_index(conn, table, name):
+    if name not in {ix["name"] for ix in inspect(conn).get_indexes(table)}:
+        return
+    quote = conn.dialect.identifier_preparer.quote
+    if conn.dialect.name == "mysql":
+        conn.exec_driver_sql(
+            f"ALTER TABLE {quote(table)} DROP INDEX {quote(name)}, ALGORITHM=INPLACE, LOCK=NONE"
+        )
+    else:
+        conn.exec_driver_sql(f"DROP INDEX {quote(name)}")
+
+
+def rebuild_sqlite_table(conn, table, indexes):
+    """SQLite cannot ALTER constraints in: moves the rows into `table` created afresh.
+
+    Needs foreign keys off (see migration_connection), or dropping the old table
+    would cascade; legacy_alter_table keeps the rename from repointing the
+    foreign keys of other tables at the old copy.
+    """
+    old = f"{table.name}_old"
+    columns = ", ".join(f'"{c.name}"' for c in table.columns)
+    conn.exec_driver_sql("PRAGMA legacy_alter_table=ON")
+    try:
+        conn.exec_driver_sql(f'ALTER TABLE "{table.name}" RENAME TO "{old}"')
+    finally:
+        conn.exec_driver_sql("PRAGMA legacy_alter_table=OFF")
+    table.create(conn)
+    conn.exec_driver_sql(f'INSERT INTO "{table.name}" ({columns}) SELECT {columns} FROM "{old}"')
+    conn.exec_driver_sql(f'DROP TABLE "{old}"')
+    for ix in indexes:
+        create_index(conn, ix)
+
+
+def delete_orphan_messages(conn):
+    # Messages were never deleted with their project before the cascades
+    conn.exec_driver_sql(
+        "DELETE FROM messages WHERE project_id IS NULL "
+        "OR project_id NOT IN (SELECT id FROM projects)"
+    )
+
+
+# Every migration below spells out its own tables and indexes rather than
+# reading the models, so replaying 1..N rebuilds the schema as it was at N.
+
+@migration(1, "admin, mentor, student, projects and messages tables")
+def create_base_tables(conn):
+    # The schema the app created with create_all() before migrations existed
+    meta = MetaData()
+    Table(
+        "admin", meta,
+        Column("admin_id", Integer, primary_key=True),
+        Column("username", String(50), unique=True, nullable=False),
+        Column("password", String(255), nullable=False),
+    )
+    Table(
+        "mentor", meta,
+        Column("mentor_id", Integer, primary_key=True),
+        Column("name", String(100), nullable=False),
+        Column("email", String(100), unique=True, nullable=False),
+        Column("password", String(255), nullable=False),
+        Column("department", String(100)),
+    )
+    Table(
+        "student", meta,
+        Column("student_id", Integer, primary_key=True),
+        Column("name", String(100), nullable=False),
+        Column("prn", String(50), unique=True, nullable=False),
+        Column("email", String(100), unique=True, nullable=False),
+        Column("password", String(255), nullable=False),
+        Column("mentor_id", Integer, ForeignKey("mentor.mentor_id")),
+        Column("github_link", String(255)),
+    )
+    Table(
+        "projects", meta,
+        Column("id", Integer, primary_key=True),
+        Column("project_id", String(20), nullable=False),
+        Column("title", String(255), nullable=False),
+        Column("description", Text),
+        Column("student_id", Integer, nullable=False),
+        Column("mentor_id", Integer),
+        Column("status", String(30), nullable=False),
+        Column("progress_percentage", Integer, nullable=False),
+        Column("mentor_feedback", Text),
+        Column("github_link", String(255)),
+        Column("submission_date", DateTime, server_default=func.now()),
+        Column("last_updated", DateTime, server_default=func.now()),
+    )
+    Table(
+        "messages", meta,
+        Column("message_id", Integer, primary_key=True),
+        Column("project_id", Integer),
+        Column("sender_type", String(20)),
+        Column("sender_id", Integer),
+        Column("message_text", Text),
+        Column("sent_at", DateTime, server_default=func.now()),
+    )
+    meta.create_all(conn, checkfirst=True)
+
+
+LOOKUP_INDEXES = [
+    index("student", "ix_student_mentor_id", "mentor_id"),
+    index("projects", "ix_projects_mentor_status", "mentor_id", "status"),
+    index("projects", "ix_projects_student_status", "student_id", "status"),
+    index("projects", "ix_projects_status", "status"),
+    index("messages", "ix_messages_project_sent", "project_id", "sent_at"),
+]
+
+
+@migration(2, "indexes for mentor, student and message lookups")
+def add_lookup_indexes(conn):
+    for ix in LOOKUP_INDEXES:
+        create_index(conn, ix)
+
+
+@migration(3, "foreign keys with ON DELETE cascades, orphan cleanup")
+def add_foreign_keys(conn):
+    # Rows the new constraints would reject. Projects first: their messages are orphans too
+    conn.exec_driver_sql(
+        "DELETE FROM projects WHERE student_id NOT IN (SELECT student_id FROM student)"
+    )
+    delete_orphan_messages(conn)
+    conn.exec_driver_sql(
+        "UPDATE projects SET mentor_id = NULL "
+        "WHERE mentor_id NOT IN (SELECT mentor_id FROM mentor)"
+    )
+    conn.exec_driver_sql(
+        "UPDATE student SET mentor_id = NULL "
+        "WHERE mentor_id NOT IN (SELECT mentor_id FROM mentor)"
+    )
+
+    if conn.dialect.name == "sqlite":
+        rebuild_with_foreign_keys(conn)
+        return
+    if conn.dialect.name != "mysql":
+        return
+
+    # (table, constraint, column, referenced table, referenced column, ON DELETE)
+    foreign_keys = [
+        ("student", "fk_student_mentor", "mentor_id", "mentor", "mentor_id", "SET NULL"),
+        ("projects", "fk_projects_student", "student_id", "student", "student_id", "CASCADE"),
+        ("projects", "fk_projects_mentor", "mentor_id", "mentor", "mentor_id", "CASCADE"),
+        ("messages", "fk_messages_project", "project_id", "projects", "id", "CASCADE"),
+    ]
+    inspector = inspect(conn)
+    for table, name, column, ref_table, ref_column, ondelete in foreign_keys:
+        existing = inspector.get_foreign_keys(table)
+        for old in existing:
+            if old["constrained_columns"] == [column] and old["name"] != name:
+                conn.exec_driver_sql(f"ALTER TABLE `{table}` DROP FOREIGN KEY `{old['name']}`")
+        if name in {old["name"] for old in existing}:
+            continue
+        # Orphans are gone, so skip the check and let InnoDB add the key in place
+        conn.exec_driver_sql("SET SESSION foreign_key_checks = 0")
+        try:
+            conn.exec_driver_sql(
+                f"ALTER TABLE `{table}` ADD CONSTRAINT `{name}` FOREIGN KEY (`{column}`) "
+                f"REFERENCES `{ref_table}` (`{ref_column}`) "
+                f"ON DELETE {ondelete}, ALGORITHM=INPLACE, LOCK=NONE"
+            )
+        finally:
+            conn.exec_driver_sql("SET SESSION foreign_key_checks = 1")
+
+
+def rebuild_with_foreign_keys(conn):
+    """Migration 3 on SQLite: student, projects and messages as of version 3."""
+    meta = MetaData()
+    Table("mentor", meta, Column("mentor_id", Integer, primary_key=True))
+    student = Table(
+        "student", meta,
+        Column("student_id", Integer, primary_key=True),
+        Column("name", String(100), nullable=False),
+        Column("prn", String(50), unique=True, nullable=False),
+        Column("email", String(100), unique=True, nullable=False),
+        Column("password", String(255), nullable=False),
+        Column(
+            "mentor_id", Integer,
+            ForeignKey("mentor.mentor_id", name="fk_student_mentor", ondelete="SET NULL"),
+        ),
+        Column("github_link", String(255)),
+    )
+    projects = Table(
+        "projects", meta,
+        Column("id", Integer, primary_key=True),
+        Column("project_id", String(20), nullable=False),
+        Column("title", String(255), nullable=False),
+        Column("description", Text),
+        Column(
+            "student_id", Integer,
+            ForeignKey("student.student_id", name="fk_projects_student", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        Column(
+            "mentor_id", Integer,
+            ForeignKey("mentor.mentor_id", name="fk_projects_mentor", ondelete="CASCADE"),
+        ),
+        Column("status", String(30), nullable=False),
+        Column("progress_percentage", Integer, nullable=False),
+        Column("mentor_feedback", Text),
+        Column("github_link", String(255)),
+        Column("submission_date", DateTime, server_default=func.now()),
+        Column("last_updated", DateTime, server_default=func.now()),
+    )
+    messages = Table(
+        "messages", meta,
+        Column("message_id", Integer, primary_key=True),
+        Column(
+            "project_id", Integer,
+            ForeignKey("projects.id", name="fk_messages_project", ondelete="CASCADE"),
+        ),
+        Column("sender_type", String(20)),
+        Column("sender_id", Integer),
+        Column("message_text", Text),
+        Column("sent_at", DateTime, server_default=func.now()),
+    )
+    for table in (student, projects, messages):
+        rebuild_sqlite_table(conn, table, [ix for ix in LOOKUP_INDEXES if ix.table.name == table.name])
+
+
+@migration(4, "indexes for admin list filters and sorting")
+def add_admin_filter_indexes(conn):
+    for ix in [
+        index("mentor", "ix_mentor_name", "name"),
+        index("mentor", "ix_mentor_department", "department"),
+        index("student", "ix_student_name", "name"),
+        index("projects", "ix_projects_project_id", "project_id"),
+        index("projects", "ix_projects_title", "title"),
+    ]:
+        create_index(conn, ix)
+
+
+@migration(5, "project_stats counters, populated from projects")
+def add_project_stats(conn):
+    meta = MetaData()
+    Table(
+        "project_stats", meta,
+        Column("mentor_id", Integer, primary_key=True, autoincrement=False),
+        Column("status", String(30), primary_key=True),
+        Column("department", String(100)),
+        Column("project_count", Integer, nullable=False),
+        Column("progress_total", BigInteger, nullable=False),
+        Index("ix_project_stats_department", "department"),
+    )
+    meta.create_all(conn, checkfirst=True)
+    stats.rebuild(conn)
+
+
+@migration(6, "message index for incremental chat fetches")
+def add_message_cursor_index(conn):
+    create_index(conn, index("messages", "ix_messages_project_message", "project_id", "message_id"))
+
+
+@migration(7, "message_reads cursors and unread counters, backfilled from messages")
+def add_message_reads(conn):
+    meta = MetaData()
+    Table("projects", meta, Column("id", Integer, primary_key=True))
+    message_reads = Table(
+        "message_reads", meta,
+        Column(
+            "project_id", Integer,
+            ForeignKey("projects.id", name="fk_message_reads_project", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        Column("reader_type", String(20), primary_key=True),
+        Column("reader_id", Integer, primary_key=True, autoincrement=False),
+        Column("last_read_message_id", Integer, nullable=False),
+        Column("unread_count", Integer, nullable=False),
+        Index("ix_message_reads_reader", "reader_type", "reader_id"),
+    )
+    message_reads.create(conn, checkfirst=True)
+    receipts.backfill(conn)
+
+
+@migration(8, "conversation_summary per project, backfilled from messages")
+def add_conversation_summary(conn):
+    meta = MetaData()
+    Table("projects", meta, Column("id", Integer, primary_key=True))
+    conversation_summary = Table(
+        "conversation_summary", meta,
+        Column(
+            "project_id", Integer,
+            ForeignKey("projects.id", name="fk_conversation_summary_project", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        Column("last_message_id", Integer, nullable=False),
+        Column("last_message_preview", String(255)),
+        Column("last_sender_type", String(20)),
+        Column("last_message_at", DateTime),
+        Column("message_count", Integer, nullable=False),
+    )
+    conversation_summary.create(conn, checkfirst=True)
+    # Databases that ran migration 3 before it deleted orphaned projects first still hold
+    # their messages, which MySQL let through with foreign_key_checks off
+    delete_orphan_messages(conn)
+    receipts.backfill_summaries(conn)
+
+
+@migration(9, "drop ix_messages_project_sent, unused since chat fetches page by message_id")
+def drop_message_sent_index(conn):
+    drop_index(conn, "messages", "ix_messages_project_sent")
+
+
+def current_version(conn):
+    return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def head_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+@contextmanager
+def migration_lock(bind):
+    """Serialises upgrade() across processes, e.g. the migrate initContainers of several pods.
+
+    Held on its own connection for the whole run; SQLite has no named locks and is never
+    shared between pods.
+    """
+    with bind.connect() as conn:
+        dialect = conn.dialect.name
+        if dialect == "mysql":
+            acquired = conn.execute(
+                text("SELECT GET_LOCK(:name, :timeout)"), {"name": LOCK_NAME, "timeout": LOCK_TIMEOUT}
+            ).scalar()
+            if acquired != 1:
+                raise RuntimeError(f"Timed out after {LOCK_TIMEOUT}s waiting for the migration lock")
+        elif dialect == "postgresql":
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": LOCK_KEY})
+        try:
+            yield
+        finally:
+            # The connection goes back to the pool, so the lock has to be released explicitly
+            if dialect == "mysql":
+                conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+            elif dialect == "postgresql":
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LOCK_KEY})
+
+
+@contextmanager
+def migration_connection(bind):
+    """A connection for one migration; on SQLite with foreign keys off, for table rebuilds.
+
+    SQLite ignores the pragma inside a transaction, so it is switched around the
+    caller's; the pooled connection gets it back on afterwards.
+    """
+    with bind.connect() as conn:
+        if conn.dialect.name != "sqlite":
+            yield conn
+            return
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        conn.commit()
+        try:
+            yield conn
+        finally:
+            conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+            conn.commit()
+
+
+def upgrade(bind=engine):
+    applied = []
+    with migration_lock(bind):
+        schema_metadata.create_all(bind)
+        for version, description, fn in MIGRATIONS:
+            # Re-read under the lock: another process may have applied it while we waited
+            with migration_connection(bind) as conn, conn.begin():
+                if version <= current_version(conn):
+                    continue
+                fn(conn)
+                conn.execute(insert(schema_version).values(version=version, description=description))
+            applied.append(version)
+    return applied
+
+
+def check(bind=engine):
+    """One cheap query at startup instead of reflecting every table."""
+    try:
+        with bind.connect() as conn:
+            version = current_version(conn)
+    except SQLAlchemyError as e:
+        raise RuntimeError(
+            "Schema is not initialised; run `python -m app.migrations upgrade`"
+        ) from e
+
+    if version < head_version():
+        raise RuntimeError(
+            f"Schema is at version {version}, code expects {head_version()}; "
+            "run `python -m app.migrations upgrade`"
+        )
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.migrations")
+    parser.add_argument("command", choices=["upgrade", "current", "check"])
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        applied = upgrade()
+        print(f"Applied migrations: {applied}" if applied else "Schema is up to date")
+    elif args.command == "current":
+        with engine.connect() as conn:
+            print(f"current: {current_version(conn)}, head: {head_version()}")
+    else:
+        print(f"Schema version {check()} is current")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import BigInteger, Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -11,34 +11,50 @@ class Admin(Base):
 class Mentor(Base):
     __tablename__ = "mentor"
     mentor_id = Column(Integer, primary_key=True)
-    name = Column(String(100), nullable=False)
+    name = Column(String(100), nullable=False, index=True)
     email = Column(String(100), unique=True, nullable=False)
     password = Column(String(255), nullable=False)
-    department = Column(String(100))
+    department = Column(String(100), index=True)
 
 class Student(Base):
     __tablename__ = "student"
     student_id = Column(Integer, primary_key=True)
-    name = Column(String(100), nullable=False)
+    name = Column(String(100), nullable=False, index=True)
     prn = Column(String(50), unique=True, nullable=False)
     email = Column(String(100), unique=True, nullable=False)
     password = Column(String(255), nullable=False)
-    mentor_id = Column(Integer, ForeignKey("mentor.mentor_id"))
+    mentor_id = Column(
+        Integer,
+        ForeignKey("mentor.mentor_id", name="fk_student_mentor", ondelete="SET NULL"),
+        index=True
+    )
     github_link = Column(String(255))
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("ix_projects_mentor_status", "mentor_id", "status"),
+        Index("ix_projects_student_status", "student_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True)
-    project_id = Column(String(20), nullable=False)
+    project_id = Column(String(20), nullable=False, index=True)
 
-    title = Column(String(255), nullable=False)
+    title = Column(String(255), nullable=False, index=True)
     description = Column(Text)
 
-    student_id = Column(Integer, nullable=False)
-    mentor_id = Column(Integer, nullable=True)
+    student_id = Column(
+        Integer,
+        ForeignKey("student.student_id", name="fk_projects_student", ondelete="CASCADE"),
+        nullable=False
+    )
+    mentor_id = Column(
+        Integer,
+        ForeignKey("mentor.mentor_id", name="fk_projects_mentor", ondelete="CASCADE"),
+        nullable=True
+    )
 
-    status = Column(String(30), nullable=False, default="Pending")
+    status = Column(String(30), nullable=False, default="Pending", index=True)
     progress_percentage = Column(Integer, nullable=False, default=0)
 
     mentor_feedback = Column(Text)
@@ -53,9 +69,55 @@ class Project(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_project_message", "project_id", "message_id"),
+    )
     message_id = Column(Integer, primary_key=True)
-    project_id = Column(Integer)
+    project_id = Column(
+        Integer,
+        ForeignKey("projects.id", name="fk_messages_project", ondelete="CASCADE")
+    )
     sender_type = Column(String(20))
     sender_id = Column(Integer)
     message_text = Column(Text)
     sent_at = Column(DateTime, server_default=func.now())
+
+class ProjectStat(Base):
+    """Project counters per mentor and status, maintained by app.stats alongside every project write."""
+    __tablename__ = "project_stats"
+    # 0 for projects without a mentor; no FK so the sentinel row can exist
+    mentor_id = Column(Integer, primary_key=True, autoincrement=False)
+    status = Column(String(30), primary_key=True)
+    department = Column(String(100), index=True)
+    project_count = Column(Integer, nullable=False, default=0)
+    progress_total = Column(BigInteger, nullable=False, default=0)
+
+class MessageRead(Base):
+    """How far a project participant has read its chat, and how many messages they have not."""
+    __tablename__ = "message_reads"
+    __table_args__ = (
+        Index("ix_message_reads_reader", "reader_type", "reader_id"),
+    )
+    project_id = Column(
+        Integer,
+        ForeignKey("projects.id", name="fk_message_reads_project", ondelete="CASCADE"),
+        primary_key=True
+    )
+    reader_type = Column(String(20), primary_key=True)
+    reader_id = Column(Integer, primary_key=True, autoincrement=False)
+    last_read_message_id = Column(Integer, nullable=False, default=0)
+    unread_count = Column(Integer, nullable=False, default=0)
+
+class ConversationSummary(Base):
+    """Latest message and message count of a project's chat, kept current by send_message."""
+    __tablename__ = "conversation_summary"
+    project_id = Column(
+        Integer,
+        ForeignKey("projects.id", name="fk_conversation_summary_project", ondelete="CASCADE"),
+        primary_key=True
+    )
+    last_message_id = Column(Integer, nullable=False)
+    last_message_preview = Column(String(255))
+    last_sender_type = Column(String(20))
+    last_message_at = Column(DateTime)
+    message_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,94 @@
+import base64
+import json
+from typing import Optional
+from fastapi import HTTPException, Query
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+MAX_LIMIT = 500
+
+# Rows per page for clients that send no `limit`; they follow X-Next-Cursor for the rest
+DEFAULT_LIMIT = 100
+
+
+class PageParams:
+    """Keyset paging query params; every response is one page of at most `limit` rows."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.include_total = include_total
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, size):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(400, "Invalid cursor")
+    return values
+
+
+def sort_column(expr):
+    if isinstance(expr, UnaryExpression) and expr.modifier in (operators.desc_op, operators.asc_op):
+        return expr.element, expr.modifier is operators.desc_op
+    return expr, False
+
+
+def after(order_by, values):
+    # (a, b) > (va, vb) spelled out so mixed ASC/DESC keys work on every backend
+    clauses = []
+    for i, (expr, value) in enumerate(zip(order_by, values)):
+        column, desc = sort_column(expr)
+        equal = [sort_column(prev)[0] == v for prev, v in zip(order_by[:i], values[:i])]
+        clauses.append(and_(*equal, column < value if desc else column > value))
+    return or_(*clauses)
+
+
+async def paginate(db, stmt, page, response, order_by, key=None):
+    """Runs `stmt` one page at a time.
+
+    `order_by` must be a unique, non-null sort key (end it with the primary key).
+    By default the cursor is read from the row attributes named like the sort
+    columns; pass `key(row)` when the select labels them differently. The next
+    cursor and the optional total are returned in the X-Next-Cursor / X-Total-Count
+    headers.
+    """
+    if key is None:
+        names = [sort_column(expr)[0].key for expr in order_by]
+        key = lambda row: [getattr(row, name) for name in names]
+
+    if page.include_total:
+        total = await db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+        response.headers["X-Total-Count"] = str(total)
+
+    if page.cursor:
+        stmt = stmt.where(after(order_by, decode_cursor(page.cursor, len(order_by))))
+    stmt = stmt.order_by(*order_by)
+
+    rows = (await db.execute(stmt.limit(page.limit + 1))).all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(list(key(rows[-1])))
+    return rows
+
+
+def sort_order(sort, columns, primary_key):
+    """Maps `name` / `-name` to a keyset-safe ORDER BY ending in the primary key."""
+    desc = sort.startswith("-")
+    column = columns.get(sort.lstrip("-"))
+    if column is None:
+        raise HTTPException(400, f"Cannot sort by {sort!r}; use one of {sorted(columns)}")
+    order_by = [column] if column is primary_key else [column, primary_key]
+    return [c.desc() for c in order_by] if desc else order_by
@@ -0,0 +1,89 @@
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+class PoolStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self.lock:
+            self.waits += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def record(self, counter):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+class MeteredPool:
+    """Times every checkout so queueing on a saturated pool shows up in /system/pool."""
+
+    stats = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.stats.record_wait(time.perf_counter() - start, timed_out)
+
+
+def metered_pool_class(is_async, stats):
+    # stats lives on the class so it survives pool.recreate() / engine.dispose()
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    return type(f"Metered{base.__name__}", (MeteredPool, base), {"stats": stats})
+
+
+# name -> (engine, PoolStats) for every engine that serves requests
+POOLS = {}
+
+
+def register(name, engine, stats):
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_conn, record, proxy):
+        stats.record("checkouts")
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_conn, record):
+        stats.record("connects")
+
+    POOLS[name] = (sync_engine, stats)
+
+
+def pool_status():
+    data = []
+    for name, (engine, stats) in POOLS.items():
+        pool = engine.pool
+        with stats.lock:
+            data.append({
+                "name": name,
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": stats.checkouts,
+                "connects": stats.connects,
+                "checkout_timeouts": stats.timeouts,
+                "wait_total_ms": round(stats.wait_total * 1000, 3),
+                "wait_avg_ms": round(stats.wait_total * 1000 / stats.waits, 3) if stats.waits else 0.0,
+                "wait_max_ms": round(stats.wait_max * 1000, 3),
+            })
+    return data
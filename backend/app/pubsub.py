@@ -0,0 +1,75 @@
+import asyncio
+import logging
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Reconnect attempts back off 1, 2, 4... seconds up to this
+RECONNECT_MAX_SECONDS = 30
+
+
+class Listener:
+    """A Redis pub/sub subscription that outlives connection drops and bad messages.
+
+    pubsub.run() without an exception_handler ends its task on the first error,
+    after which the replica silently stops receiving. Here a bad message is
+    logged and skipped, and a lost connection is re-established with backoff;
+    the connect callback redis-py registers re-subscribes the channel.
+    """
+
+    def __init__(self, redis, channel, callback):
+        self.redis = redis
+        self.channel = channel
+        self.callback = callback
+        self.pubsub = None
+        self.task = None
+        self.connected = False
+        self.failures = 0
+        self.errors = 0
+        self.last_error = None
+
+    async def start(self):
+        self.pubsub = self.redis.pubsub()
+        await self.pubsub.subscribe(**{self.channel: self.on_message})
+        self.connected = True
+        self.task = asyncio.create_task(self.pubsub.run(exception_handler=self.on_error))
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+        if self.pubsub is not None:
+            await self.pubsub.aclose()
+
+    async def on_message(self, message):
+        await self.callback(message["data"])
+
+    async def on_error(self, error, pubsub):
+        self.errors += 1
+        self.last_error = repr(error)
+        if not isinstance(error, (RedisConnectionError, RedisTimeoutError, OSError)):
+            logger.warning("Skipped a message on %s: %r", self.channel, error)
+            return
+
+        self.connected = False
+        self.failures += 1
+        delay = min(2 ** (self.failures - 1), RECONNECT_MAX_SECONDS)
+        logger.warning("Lost the %s subscription (%r); reconnecting in %ss", self.channel, error, delay)
+        await asyncio.sleep(delay)
+        try:
+            await pubsub.connect()
+        except Exception as e:
+            # run() calls back here on its next read, with a longer delay
+            self.last_error = repr(e)
+            return
+        self.connected = True
+        self.failures = 0
+        logger.warning("Re-subscribed to %s", self.channel)
+
+    def health(self):
+        return {
+            "channel": self.channel,
+            "listening": self.task is not None and not self.task.done(),
+            "connected": self.connected,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import os
+from collections import defaultdict, namedtuple
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Idle streams send a comment this often so proxies keep them open
+KEEPALIVE_SECONDS = 15
+
+# Events a subscriber may fall behind by before it is cut off to catch up from the database
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("REALTIME_QUEUE_SIZE", "100"))
+
+# Events all subscribers of one topic may hold between them; see Hub.deliver
+TOPIC_BUFFER_SIZE = int(os.getenv("REALTIME_TOPIC_BUFFER", "10000"))
+
+# However many subscribers share a topic, each may still fall this far behind
+MIN_SUBSCRIBER_LAG = 10
+
+# A publish waits this long for the broker before the event is given up on
+PUBLISH_TIMEOUT_SECONDS = float(os.getenv("REALTIME_PUBLISH_TIMEOUT", "2"))
+
+# `data` is the JSON text sent to every subscriber; `id` is the message_id for
+# "message" events (the SSE event id) and None otherwise
+Event = namedtuple("Event", ["kind", "id", "data"])
+
+
+def message_topic(project_id):
+    return f"messages:{project_id}"
+
+
+def status_topic(project_id):
+    return f"status:{project_id}"
+
+
+def status_event(project):
+    return Event("status", None, orjson.dumps({
+        "project_id": project.id,
+        "status": project.status,
+        "progress_percentage": project.progress_percentage,
+        "mentor_feedback": project.mentor_feedback,
+    }).decode())
+
+
+class MemoryBroker:
+    """Stand-in for Redis: delivers to every hub started on it, all in this process."""
+
+    def __init__(self):
+        self.receivers = []
+
+    async def start(self, deliver):
+        self.receivers.append(deliver)
+
+    async def publish(self, topic, event):
+        for deliver in self.receivers:
+            deliver(topic, event)
+
+    async def stop(self):
+        pass
+
+    def health(self):
+        return {"channel": "memory", "listening": True, "connected": True, "errors": 0, "last_error": None}
+
+
+class RedisBroker:
+    """Every replica publishes to and listens on one Redis pub/sub channel."""
+
+    channel = "pmms:events"
+
+    def __init__(self, url):
+        import redis.asyncio as redis
+        self.redis = redis.from_url(url)
+        self.listener = None
+
+    async def start(self, deliver):
+        from app.pubsub import Listener
+
+        async def handler(data):
+            topic, kind, event_id, data = orjson.loads(data)
+            deliver(topic, Event(kind, event_id, data))
+
+        self.listener = Listener(self.redis, self.channel, handler)
+        await self.listener.start()
+
+    async def publish(self, topic, event):
+        await self.redis.publish(self.channel, orjson.dumps([topic, *event]))
+
+    async def stop(self):
+        if self.listener is not None:
+            await self.listener.stop()
+        await self.redis.aclose()
+
+    def health(self):
+        if self.listener is None:
+            return {"channel": self.channel, "listening": False, "connected": False, "errors": 0, "last_error": None}
+        return self.listener.health()
+
+
+class Subscription:
+    def __init__(self, topics, maxsize):
+        self.topics = topics
+        self.queue = asyncio.Queue(maxsize)
+
+    async def get(self):
+        """Next event, or None once the subscriber fell too far behind and was dropped."""
+        return await self.queue.get()
+
+
+class Hub:
+    """Fans events from the broker out to this process's subscribers.
+
+    An idle subscriber is one bounded queue and one parked coroutine; nothing
+    polls, so a worker holds thousands of them for the cost of their sockets.
+    A subscriber whose queue fills up is dropped instead of buffering without
+    limit; its stream ends and the client reconnects with its last message_id.
+
+    publish() runs after the write committed, so it never raises: a broker
+    outage costs the live update (clients catch up on reconnect), not the write.
+    """
+
+    def __init__(self, broker, queue_size=SUBSCRIBER_QUEUE_SIZE, topic_buffer=TOPIC_BUFFER_SIZE):
+        self.broker = broker
+        self.queue_size = queue_size
+        self.topic_buffer = topic_buffer
+        self.topics = defaultdict(set)
+        self.dropped = 0
+        self.publish_errors = 0
+
+    async def start(self):
+        await self.broker.start(self.deliver)
+
+    async def stop(self):
+        await self.broker.stop()
+
+    def subscribe(self, *topics):
+        subscription = Subscription(topics, self.queue_size)
+        for topic in topics:
+            self.topics[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        for topic in subscription.topics:
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.topics[topic]
+
+    async def publish(self, topic, event):
+        try:
+            await asyncio.wait_for(self.broker.publish(topic, event), PUBLISH_TIMEOUT_SECONDS)
+        except Exception as e:
+            self.publish_errors += 1
+            logger.warning("Could not publish a %s event on %s: %r", event.kind, topic, e)
+
+    def lag_limit(self, subscribers):
+        """How far each of `subscribers` (one topic's) may fall behind.
+
+        The topic's subscribers share topic_buffer queued events, so a topic
+        thousands of clients watch lets each lag less than a quiet one does.
+        """
+        return min(self.queue_size, max(MIN_SUBSCRIBER_LAG, self.topic_buffer // len(subscribers)))
+
+    def deliver(self, topic, event):
+        subscribers = self.topics.get(topic)
+        if not subscribers:
+            return
+        limit = self.lag_limit(subscribers)
+        for subscription in list(subscribers):
+            if subscription.queue.qsize() >= limit:
+                self.drop(subscription)
+                continue
+            subscription.queue.put_nowait(event)
+
+    def drop(self, subscription):
+        self.unsubscribe(subscription)
+        self.dropped += 1
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+    def stats(self):
+        return {
+            "topics": len(self.topics),
+            "subscribers": len(set().union(*self.topics.values())),
+            "queue_size": self.queue_size,
+            "topic_buffer": self.topic_buffer,
+            "dropped": self.dropped,
+            "publish_errors": self.publish_errors,
+        }
+
+
+# BROKER_URL=redis://host:6379/0 fans events out across replicas; defaults to CACHE_URL
+BROKER_URL = os.getenv("BROKER_URL", os.getenv("CACHE_URL", "memory://"))
+hub = Hub(MemoryBroker() if BROKER_URL.startswith("memory://") else RedisBroker(BROKER_URL))
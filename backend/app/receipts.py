@@ -0,0 +1,124 @@
+from sqlalchemy import case, func, insert, literal, select
+from app.database import upsert
+from app.models import ConversationSummary, Message, MessageRead, Project
+
+PARTICIPANTS = (("student", Project.student_id), ("mentor", Project.mentor_id))
+
+PREVIEW_LENGTH = 255
+
+
+def unread_since(project_id, reader_type, last_read_message_id=0):
+    """Messages in the project after `last_read_message_id` not sent by the reader's side."""
+    return (
+        select(func.count(Message.message_id))
+        .where(
+            Message.project_id == project_id,
+            Message.message_id > last_read_message_id,
+            func.coalesce(Message.sender_type, "") != reader_type,
+        )
+        .scalar_subquery()
+    )
+
+
+async def message_sent(db, message, project):
+    """Bumps the unread counters of `project`'s other participants; call after flush()."""
+    for reader_type, column in PARTICIPANTS:
+        reader_id = getattr(project, column.key)
+        if reader_id is None or reader_type == message.sender_type:
+            continue
+        # A first row counts the whole thread, so late joiners (a newly assigned mentor) start right
+        await db.execute(upsert(
+            MessageRead,
+            {
+                "project_id": message.project_id,
+                "reader_type": reader_type,
+                "reader_id": reader_id,
+                "last_read_message_id": 0,
+                "unread_count": unread_since(message.project_id, reader_type),
+            },
+            {"unread_count": MessageRead.unread_count + 1},
+        ))
+
+
+async def summarise(db, message):
+    """Points the project's conversation_summary row at `message`; call after flush()."""
+    newer = ConversationSummary.last_message_id < message.message_id
+    # last_message_id goes last: MySQL applies ON DUPLICATE KEY assignments in
+    # order, so the `newer` test must still see the old id for the other columns
+    latest = {
+        "last_message_preview": (message.message_text or "")[:PREVIEW_LENGTH],
+        "last_sender_type": message.sender_type,
+        "last_message_at": select(Message.sent_at)
+        .where(Message.message_id == message.message_id).scalar_subquery(),
+        "last_message_id": message.message_id,
+    }
+    await db.execute(upsert(
+        ConversationSummary,
+        {"project_id": message.project_id, "message_count": 1, **latest},
+        {
+            # Concurrent sends may commit out of order; only a newer message moves the pointer
+            **{
+                name: case((newer, value), else_=getattr(ConversationSummary, name))
+                for name, value in latest.items()
+            },
+            "message_count": ConversationSummary.message_count + 1,
+        },
+    ))
+
+
+async def mark_read(db, project_id, reader_type, reader_id, up_to):
+    # Recounted rather than zeroed, so messages newer than `up_to` stay unread
+    remaining = unread_since(project_id, reader_type, up_to)
+    await db.execute(upsert(
+        MessageRead,
+        {
+            "project_id": project_id,
+            "reader_type": reader_type,
+            "reader_id": reader_id,
+            "last_read_message_id": up_to,
+            "unread_count": remaining,
+        },
+        {"last_read_message_id": up_to, "unread_count": remaining},
+    ))
+
+
+def backfill(conn):
+    """A row per project participant, counting every message from the other side as unread."""
+    for reader_type, reader_column in PARTICIPANTS:
+        conn.execute(insert(MessageRead).from_select(
+            ["project_id", "reader_type", "reader_id", "last_read_message_id", "unread_count"],
+            select(
+                Project.id,
+                literal(reader_type),
+                reader_column,
+                literal(0),
+                unread_since(Project.id, reader_type),
+            ).where(reader_column.is_not(None))
+        ))
+
+
+def backfill_summaries(conn):
+    latest = (
+        select(
+            Message.project_id,
+            func.max(Message.message_id).label("last_message_id"),
+            func.count(Message.message_id).label("message_count"),
+        )
+        .where(Message.project_id.is_not(None))
+        .group_by(Message.project_id)
+        .subquery()
+    )
+    conn.execute(insert(ConversationSummary).from_select(
+        [
+            "project_id", "last_message_id", "last_message_preview",
+            "last_sender_type", "last_message_at", "message_count",
+        ],
+        select(
+            latest.c.project_id,
+            latest.c.last_message_id,
+            func.substr(Message.message_text, 1, PREVIEW_LENGTH),
+            Message.sender_type,
+            Message.sent_at,
+            latest.c.message_count,
+        ).join(Message, Message.message_id == latest.c.last_message_id)
+    ))
@@ -1,16 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import Student, Mentor, Project, Admin
+from typing import Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from sqlalchemy import select, case, delete, exists, func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import assignment, stats
+from app.cache import MENTORS_TAG, cached_page, mentor_cache, shared_cache
+from app.database import get_db, get_read_db
+from app.export import export_response
+from app.importer import import_students
+from app.models import Student, Mentor, Project, ProjectStat, Admin, Message
+from app.pagination import PageParams, paginate, sort_order
+from app.schemas import AutoAssignResult, BulkAssignItem, BulkResult, AdminLoginOut, AdminProjectOut, AdminStudentOut, AdminSummary, ImportResult, MentorOut, MessageResponse, StudentOut, parse_bulk_items
 
 router = APIRouter()
 
-@router.post("/login")
-def admin_login(data: dict, db: Session = Depends(get_db)):
-    admin = db.query(Admin).filter(
-        Admin.username == data["username"],
-        Admin.password == data["password"]
-    ).first()
+@router.post("/login", response_model=AdminLoginOut)
+async def admin_login(data: dict, db: AsyncSession = Depends(get_db)):
+    admin = await db.scalar(
+        select(Admin).where(
+            Admin.username == data["username"],
+            Admin.password == data["password"]
+        )
+    )
 
     if not admin:
         raise HTTPException(401, "Invalid credentials")
@@ -21,31 +31,57 @@ def admin_login(data: dict, db: Session = Depends(get_db)):
     }
 
 
-@router.get("/students")
-def get_students(db: Session = Depends(get_db)):
-    results = (
-        db.query(Student, Mentor)
+def students_query(mentor_id=None, unassigned=False, department=None, q=None):
+    stmt = (
+        select(
+            Student.student_id,
+            Student.name,
+            Student.prn,
+            Student.email,
+            Student.mentor_id,
+            Mentor.name.label("mentor_name"),
+            Student.github_link
+        )
         .outerjoin(Mentor, Student.mentor_id == Mentor.mentor_id)
-        .all()
     )
-
-    data = []
-    for student, mentor in results:
-        data.append({
-            "student_id": student.student_id,
-            "name": student.name,
-            "prn": student.prn,
-            "email": student.email,
-            "mentor_id": student.mentor_id,
-            "mentor_name": mentor.name if mentor else None,
-            "github_link": student.github_link
-        })
-
-    return data
+    if mentor_id is not None:
+        stmt = stmt.where(Student.mentor_id == mentor_id)
+    if unassigned:
+        stmt = stmt.where(Student.mentor_id.is_(None))
+    if department:
+        stmt = stmt.where(Mentor.department == department)
+    if q:
+        stmt = stmt.where(or_(
+            Student.name.startswith(q, autoescape=True),
+            Student.prn.startswith(q, autoescape=True)
+        ))
+    return stmt
+
+
+@router.get("/students", response_model=list[AdminStudentOut])
+async def get_students(
+    response: Response,
+    mentor_id: Optional[int] = None,
+    unassigned: bool = False,
+    department: Optional[str] = None,
+    q: Optional[str] = None,
+    sort: str = "student_id",
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db)
+):
+    order_by = sort_order(
+        sort,
+        {"student_id": Student.student_id, "name": Student.name, "prn": Student.prn},
+        Student.student_id
+    )
+    return await paginate(
+        db, students_query(mentor_id, unassigned, department, q), page, response,
+        order_by=order_by
+    )
 
 
-@router.post("/students")
-def add_student(data: dict, db: Session = Depends(get_db)):
+@router.post("/students", response_model=StudentOut)
+async def add_student(data: dict, db: AsyncSession = Depends(get_db)):
     student = Student(
         name=data["name"],
         prn=data["prn"],
@@ -56,73 +92,142 @@ def add_student(data: dict, db: Session = Depends(get_db)):
     )
 
     db.add(student)
-    db.commit()
-    db.refresh(student)
+    await db.commit()
+    await db.refresh(student)
 
     return student
 
 
-@router.delete("/students/{student_id}")
-def delete_student(student_id: int, db: Session = Depends(get_db)):
-
-    
-    approved = db.query(Project).filter(
-        Project.student_id == student_id,
-        Project.status == "Approved"
-    ).count()
+@router.post("/students/import", response_model=ImportResult)
+async def import_students_file(file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
+    try:
+        return await import_students(db, file.file, file.filename or "")
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+@router.delete("/students/{student_id}", response_model=MessageResponse)
+async def delete_student(student_id: int, db: AsyncSession = Depends(get_db)):
+
+    # Projects and their messages go with the student (ON DELETE CASCADE);
+    # the NOT EXISTS keeps students with approved projects
+    deltas = await stats.student_deltas(db, student_id)
+    result = await db.execute(
+        delete(Student).where(
+            Student.student_id == student_id,
+            ~exists().where(
+                Project.student_id == student_id,
+                Project.status == "Approved"
+            )
+        ).execution_options(synchronize_session=False)
+    )
 
-    if approved > 0:
+    if result.rowcount == 0:
+        if await db.get(Student, student_id) is None:
+            raise HTTPException(404, "Student not found")
         raise HTTPException(
             status_code=403,
             detail="Student has approved projects and cannot be deleted"
         )
 
-    db.query(Project).filter(
-        Project.student_id == student_id,
-        Project.status != "Approved"
-    ).delete(synchronize_session=False)
-
-    db.query(Student).filter(
-        Student.student_id == student_id
-    ).update({"mentor_id": None})
-
-    student = db.query(Student).filter(
-        Student.student_id == student_id
-    ).first()
-
-    if not student:
-        raise HTTPException(404, "Student not found")
-
-    db.delete(student)
-    db.commit()
+    await stats.apply(db, deltas)
+    await db.commit()
+    await shared_cache.invalidate(f"student:{student_id}")
 
     return {"message": "Student and related projects deleted"}
 
 
-@router.put("/assign-mentor")
-def assign_mentor(data: dict, db: Session = Depends(get_db)):
-    student = db.query(Student).filter(Student.student_id == data["student_id"]).first()
+@router.put("/assign-mentor", response_model=MessageResponse)
+async def assign_mentor(data: dict, db: AsyncSession = Depends(get_db)):
+    student = await db.get(Student, data["student_id"])
     if not student:
         raise HTTPException(404, "Student not found")
 
     student.mentor_id = data["mentor_id"]
-    db.commit()
+    await db.commit()
     return {"message": "Mentor assigned"}
 
-@router.put("/reset-student-password/{student_id}")
-def reset_student_password(student_id: int, data: dict, db: Session = Depends(get_db)):
-    student = db.query(Student).filter(Student.student_id == student_id).first()
+@router.put("/assign-mentor/bulk", response_model=BulkResult)
+async def bulk_assign_mentor(data: dict, db: AsyncSession = Depends(get_db)):
+    if not isinstance(data.get("items"), list):
+        raise HTTPException(422, "items must be a list")
+    items = parse_bulk_items(BulkAssignItem, data["items"], "student_id")
+    student_ids = {item.student_id for _, item, _ in items if item is not None}
+    mentor_ids = {item.mentor_id for _, item, _ in items if item is not None} - {None}
+
+    found_students = set(await db.scalars(
+        select(Student.student_id).where(Student.student_id.in_(student_ids))
+    )) if student_ids else set()
+    found_mentors = set(await db.scalars(
+        select(Mentor.mentor_id).where(Mentor.mentor_id.in_(mentor_ids))
+    )) if mentor_ids else set()
+
+    assignments, results = {}, []
+    for student_id, item, error in items:
+        if error is not None:
+            pass
+        elif student_id not in found_students:
+            error = "Student not found"
+        elif item.mentor_id is not None and item.mentor_id not in found_mentors:
+            error = "Mentor not found"
+        elif student_id in assignments:
+            error = "Duplicate student_id"
+        else:
+            assignments[student_id] = item.mentor_id
+        results.append({"id": student_id, "ok": error is None, "error": error})
+
+    if assignments:
+        # mentor_id None unassigns; one UPDATE ... CASE for the whole batch
+        await db.execute(
+            update(Student)
+            .where(Student.student_id.in_(assignments))
+            .values(mentor_id=case(assignments, value=Student.student_id))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    return {"updated": len(assignments), "results": results}
+
+@router.post("/auto-assign", response_model=AutoAssignResult)
+async def auto_assign_mentors(data: dict, db: AsyncSession = Depends(get_db)):
+    # Previews by default; {"dry_run": false} writes the plan
+    dry_run = data.get("dry_run", True)
+    loads, assignments, leftover = await assignment.plan(
+        db,
+        department=data.get("department"),
+        student_ids=data.get("student_ids"),
+        capacities={int(k): v for k, v in (data.get("capacities") or {}).items()},
+        default_capacity=data.get("capacity"),
+    )
+    if not dry_run:
+        assignments = await assignment.commit(db, assignments)
+
+    after = dict(loads)
+    for _, mentor_id in assignments:
+        after[mentor_id] += 1
+    return {
+        "dry_run": dry_run,
+        "assigned": len(assignments),
+        "left_unassigned": leftover,
+        "loads": [
+            {"mentor_id": m, "before": loads[m], "after": after[m]} for m in sorted(loads)
+        ],
+        "assignments": [{"student_id": s, "mentor_id": m} for s, m in assignments],
+    }
+
+@router.put("/reset-student-password/{student_id}", response_model=MessageResponse)
+async def reset_student_password(student_id: int, data: dict, db: AsyncSession = Depends(get_db)):
+    student = await db.get(Student, student_id)
     if not student:
         raise HTTPException(404, "Student not found")
 
     student.password = data["password"]
-    db.commit()
+    await db.commit()
     return {"message": "Password updated"}
 
 
-@router.put("/students/{student_id}")
-def admin_update_student(student_id: int, data: dict, db: Session = Depends(get_db)):
-    student = db.query(Student).filter(Student.student_id == student_id).first()
+@router.put("/students/{student_id}", response_model=MessageResponse)
+async def admin_update_student(student_id: int, data: dict, db: AsyncSession = Depends(get_db)):
+    student = await db.get(Student, student_id)
 
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
@@ -134,16 +239,43 @@ def admin_update_student(student_id: int, data: dict, db: Session = Depends(get_
     student.mentor_id = data.get("mentor_id", student.mentor_id)
     student.github_link = data.get("github_link", student.github_link)
 
-    db.commit()
+    await db.commit()
+    await shared_cache.invalidate(f"student:{student_id}")
     return {"message": "Student updated successfully"}
 
 
-@router.get("/mentors")
-def get_mentors(db: Session = Depends(get_db)):
-    return db.query(Mentor).all()
+@router.get("/mentors", response_model=list[MentorOut])
+async def get_mentors(
+    request: Request,
+    response: Response,
+    department: Optional[str] = None,
+    q: Optional[str] = None,
+    sort: str = "mentor_id",
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db)
+):
+    stmt = select(Mentor.mentor_id, Mentor.name, Mentor.email, Mentor.department)
+    if department:
+        stmt = stmt.where(Mentor.department == department)
+    if q:
+        stmt = stmt.where(or_(
+            Mentor.name.startswith(q, autoescape=True),
+            Mentor.email.startswith(q, autoescape=True)
+        ))
+
+    order_by = sort_order(
+        sort,
+        {"mentor_id": Mentor.mentor_id, "name": Mentor.name},
+        Mentor.mentor_id
+    )
+    return await cached_page(
+        mentor_cache, request, response,
+        lambda session: paginate(session, stmt, page, response, order_by=order_by),
+        db
+    )
 
-@router.post("/mentors")
-def add_mentor(data: dict, db: Session = Depends(get_db)):
+@router.post("/mentors", response_model=MentorOut)
+async def add_mentor(data: dict, db: AsyncSession = Depends(get_db)):
     mentor = Mentor(
         name=data["name"],
         email=data["email"],
@@ -151,42 +283,43 @@ def add_mentor(data: dict, db: Session = Depends(get_db)):
         department=data.get("department")
     )
     db.add(mentor)
-    db.commit()
-    db.refresh(mentor)
+    await db.commit()
+    await shared_cache.invalidate(MENTORS_TAG)
+    await db.refresh(mentor)
     return mentor
 
-@router.delete("/mentors/{mentor_id}")
-def delete_mentor(mentor_id: int, db: Session = Depends(get_db)):
+@router.delete("/mentors/{mentor_id}", response_model=MessageResponse)
+async def delete_mentor(mentor_id: int, db: AsyncSession = Depends(get_db)):
 
-    db.query(Project).filter(Project.mentor_id == mentor_id).delete(synchronize_session=False)
-
-    db.query(Student).filter(Student.mentor_id == mentor_id).update(
-        {"mentor_id": None}
+    # Cascades to the mentor's projects and messages; students become unassigned
+    await stats.forget_mentor(db, mentor_id)
+    result = await db.execute(
+        delete(Mentor).where(Mentor.mentor_id == mentor_id)
+        .execution_options(synchronize_session=False)
     )
-
-    mentor = db.query(Mentor).filter(Mentor.mentor_id == mentor_id).first()
-    if not mentor:
+    if result.rowcount == 0:
         raise HTTPException(404, "Mentor not found")
 
-    db.delete(mentor)
-    db.commit()
+    await db.commit()
+    await shared_cache.invalidate(MENTORS_TAG, f"mentor:{mentor_id}")
 
     return {"message": "Mentor and all related projects deleted"}
 
 
-@router.put("/reset-mentor-password/{mentor_id}")
-def reset_mentor_password(mentor_id: int, data: dict, db: Session = Depends(get_db)):
-    mentor = db.query(Mentor).filter(Mentor.mentor_id == mentor_id).first()
+@router.put("/reset-mentor-password/{mentor_id}", response_model=MessageResponse)
+async def reset_mentor_password(mentor_id: int, data: dict, db: AsyncSession = Depends(get_db)):
+    mentor = await db.get(Mentor, mentor_id)
     if not mentor:
         raise HTTPException(404, "Mentor not found")
 
     mentor.password = data["password"]
-    db.commit()
+    await db.commit()
+    await shared_cache.invalidate(MENTORS_TAG)
     return {"message": "Password updated"}
 
-@router.put("/mentors/{mentor_id}")
-def admin_update_mentor(mentor_id: int, data: dict, db: Session = Depends(get_db)):
-    mentor = db.query(Mentor).filter(Mentor.mentor_id == mentor_id).first()
+@router.put("/mentors/{mentor_id}", response_model=MessageResponse)
+async def admin_update_mentor(mentor_id: int, data: dict, db: AsyncSession = Depends(get_db)):
+    mentor = await db.get(Mentor, mentor_id)
 
     if not mentor:
         raise HTTPException(404, "Mentor not found")
@@ -195,33 +328,162 @@ def admin_update_mentor(mentor_id: int, data: dict, db: Session = Depends(get_db
     mentor.email = data.get("email", mentor.email)
     mentor.department = data.get("department", mentor.department)
     mentor.password = data.get("password", mentor.password)
+    if "department" in data:
+        await stats.set_department(db, mentor_id, mentor.department)
 
-    db.commit()
+    await db.commit()
+    await shared_cache.invalidate(MENTORS_TAG, f"mentor:{mentor_id}")
     return {"message": "Mentor updated successfully"}
 
 
 
-@router.get("/projects")
-def get_projects(db: Session = Depends(get_db)):
-    results = (
-        db.query(Project, Student, Mentor)
+def projects_query(status=None, mentor_id=None, student_id=None, department=None, q=None):
+    stmt = (
+        select(
+            Project.id,
+            Project.project_id,
+            Project.title,
+            Student.name.label("student_name"),
+            Mentor.name.label("mentor_name"),
+            Project.status,
+            Project.github_link,
+            Project.last_updated
+        )
         .join(Student, Project.student_id == Student.student_id)
         .outerjoin(Mentor, Project.mentor_id == Mentor.mentor_id)
-        .all()
     )
+    if status:
+        stmt = stmt.where(Project.status == status)
+    if mentor_id is not None:
+        stmt = stmt.where(Project.mentor_id == mentor_id)
+    if student_id is not None:
+        stmt = stmt.where(Project.student_id == student_id)
+    if department:
+        stmt = stmt.where(Mentor.department == department)
+    if q:
+        stmt = stmt.where(or_(
+            Project.title.startswith(q, autoescape=True),
+            Project.project_id.startswith(q, autoescape=True)
+        ))
+    return stmt
+
+
+@router.get("/projects", response_model=list[AdminProjectOut])
+async def get_projects(
+    response: Response,
+    status: Optional[str] = None,
+    mentor_id: Optional[int] = None,
+    student_id: Optional[int] = None,
+    department: Optional[str] = None,
+    q: Optional[str] = None,
+    sort: str = "id",
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db)
+):
+    order_by = sort_order(
+        sort,
+        {"id": Project.id, "title": Project.title, "status": Project.status},
+        Project.id
+    )
+    return await paginate(
+        db, projects_query(status, mentor_id, student_id, department, q), page, response,
+        order_by=order_by
+    )
+
+
+@router.get("/summary", response_model=AdminSummary)
+async def get_summary(db: AsyncSession = Depends(get_read_db)):
+    # Dashboard counters: project figures come from the project_stats counters
+    total_students, assigned_students = (await db.execute(
+        select(func.count(Student.student_id), func.count(Student.mentor_id))
+    )).one()
+
+    by_status = (await db.execute(
+        select(ProjectStat.status, func.sum(ProjectStat.project_count))
+        .group_by(ProjectStat.status)
+        .having(func.sum(ProjectStat.project_count) > 0)
+    )).all()
+
+    per_mentor = (await db.execute(
+        select(
+            Mentor.mentor_id,
+            Mentor.name,
+            Mentor.department,
+            func.count(Student.student_id).label("student_count")
+        )
+        .outerjoin(Student, Student.mentor_id == Mentor.mentor_id)
+        .group_by(Mentor.mentor_id, Mentor.name, Mentor.department)
+        .order_by(Mentor.mentor_id)
+    )).all()
+
+    per_department = (await db.execute(
+        select(
+            ProjectStat.department,
+            func.sum(ProjectStat.project_count),
+            func.sum(ProjectStat.progress_total)
+        )
+        .group_by(ProjectStat.department)
+        .having(func.sum(ProjectStat.project_count) > 0)
+        .order_by(ProjectStat.department)
+    )).all()
+
+    projects_by_status = {status: int(count) for status, count in by_status}
+    return {
+        "total_students": total_students,
+        "unassigned_students": total_students - assigned_students,
+        "total_mentors": len(per_mentor),
+        "total_projects": sum(projects_by_status.values()),
+        "projects_by_status": projects_by_status,
+        "students_per_mentor": per_mentor,
+        "progress_by_department": [
+            {
+                "department": department,
+                "project_count": count,
+                "average_progress": progress / count,
+            }
+            for department, count, progress in per_department
+        ],
+    }
 
-    data = []
-    for project, student, mentor in results:
-        data.append({
-            "id": project.id,
-            "project_id": project.project_id,
-            "title": project.title,
-            "student_name": student.name,
-            "mentor_name": mentor.name if mentor else None,
-            "status": project.status,
-            "github_link": project.github_link,
-            "last_updated": project.last_updated
-        })
-
-    return data
 
+@router.get("/export/projects")
+async def export_projects(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    status: Optional[str] = None,
+    mentor_id: Optional[int] = None,
+    student_id: Optional[int] = None,
+    department: Optional[str] = None,
+    q: Optional[str] = None
+):
+    stmt = projects_query(status, mentor_id, student_id, department, q).order_by(Project.id)
+    return export_response(stmt, fmt, "projects")
+
+
+@router.get("/export/students")
+async def export_students(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    mentor_id: Optional[int] = None,
+    unassigned: bool = False,
+    department: Optional[str] = None,
+    q: Optional[str] = None
+):
+    stmt = students_query(mentor_id, unassigned, department, q).order_by(Student.student_id)
+    return export_response(stmt, fmt, "students")
+
+
+@router.get("/export/messages")
+async def export_messages(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    project_id: Optional[int] = None
+):
+    stmt = select(
+        Message.message_id,
+        Message.project_id,
+        Message.sender_type,
+        Message.sender_id,
+        Message.message_text,
+        Message.sent_at
+    ).order_by(Message.message_id)
+    if project_id is not None:
+        stmt = stmt.where(Message.project_id == project_id)
+    return export_response(stmt, fmt, "messages")
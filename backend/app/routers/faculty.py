@@ -1,17 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import Mentor, Student, Project
+from types import SimpleNamespace
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import and_, select, case, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import stats
+from app.cache import cached_page, entity_tags, mentor_cache, shared_cache
+from app.conditional import conditional
+from app.database import get_db, get_read_db, reads_from_primary
+from app.models import ConversationSummary, Mentor, MessageRead, Student, Project
+from app.pagination import PageParams, paginate
+from app.realtime import hub, status_event, status_topic
+from app.schemas import (
+    BulkResult, BulkStatusItem, InboxEntry, MentorLoginOut, MentorOut, MentorProjectOut, MentorStudentOut,
+    MessageResponse, parse_bulk_items
+)
 
 router = APIRouter()
 
 
-@router.post("/login")
-def mentor_login(data: dict, db: Session = Depends(get_db)):
-    mentor = db.query(Mentor).filter(
-        Mentor.email == data["username"],
-        Mentor.password == data["password"]
-    ).first()
+@router.post("/login", response_model=MentorLoginOut)
+async def mentor_login(data: dict, db: AsyncSession = Depends(get_db)):
+    mentor = await db.scalar(
+        select(Mentor).where(
+            Mentor.email == data["username"],
+            Mentor.password == data["password"]
+        )
+    )
 
     if not mentor:
         raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -26,50 +39,64 @@ def mentor_login(data: dict, db: Session = Depends(get_db)):
     }
 
 
-@router.get("/")
-def get_all_mentors(db: Session = Depends(get_db)):
-    return db.query(Mentor).all()
-
-@router.get("/projects/{mentor_id}")
-def get_mentor_projects(mentor_id: int, db: Session = Depends(get_db)):
-    rows = (
-        db.query(Project, Student)
-        .join(Student, Project.student_id == Student.student_id)
-        .filter(Project.mentor_id == mentor_id)
-        .all()
+@router.get("/", response_model=list[MentorOut])
+async def get_all_mentors(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db)
+):
+    return await cached_page(
+        mentor_cache, request, response,
+        lambda session: paginate(
+            session, select(Mentor.mentor_id, Mentor.name, Mentor.email, Mentor.department),
+            page, response,
+            order_by=[Mentor.mentor_id]
+        ),
+        db
     )
 
-    data = []
-    for project, student in rows:
-        data.append({
-            "id": project.id,
-            "project_id": project.project_id,
-            "title": project.title,
-            "student_name": student.name,
-            "github_link": project.github_link,
-            "status": project.status or "Pending",
-            "progress_percentage": project.progress_percentage or 0,
-            "mentor_feedback": project.mentor_feedback or "",
-            "last_updated": (
-                project.last_updated
-                if project.last_updated
-                else project.submission_date
+@router.get("/projects/{mentor_id}", response_model=list[MentorProjectOut])
+async def get_mentor_projects(
+    mentor_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
+):
+    async def load(session):
+        rows = (await session.execute(
+            select(
+                Project.id,
+                Project.project_id,
+                Project.title,
+                Student.name.label("student_name"),
+                Project.github_link,
+                func.coalesce(Project.status, "Pending").label("status"),
+                func.coalesce(Project.progress_percentage, 0).label("progress_percentage"),
+                func.coalesce(Project.mentor_feedback, "").label("mentor_feedback"),
+                func.coalesce(Project.last_updated, Project.submission_date).label("last_updated"),
+                Project.student_id
             )
-        })
-
-    return data
-
-
-
+            .join(Student, Project.student_id == Student.student_id)
+            .where(Project.mentor_id == mentor_id)
+        )).all()
+        tags = [f"mentor:{mentor_id}", *entity_tags(rows, "student")]
+        return [row._asdict() for row in rows], tags
+
+    rows = await shared_cache.get_or_load(
+        request.url.path, load, db, sticky=reads_from_primary(request)
+    )
+    return conditional(request, response, rows)
 
 
-@router.put("/projects/{project_id}/status")
-def update_project_status(project_id: int, data: dict, db: Session = Depends(get_db)):
-    project = db.query(Project).filter(Project.id == project_id).first()
+@router.put("/projects/{project_id}/status", response_model=MessageResponse)
+async def update_project_status(project_id: int, data: dict, db: AsyncSession = Depends(get_db)):
+    project = await db.get(Project, project_id, with_for_update=True)
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    deltas = stats.add_project({}, project, -1)
     project.status = data["status"]
 
     if "mentor_feedback" in data:
@@ -78,24 +105,136 @@ def update_project_status(project_id: int, data: dict, db: Session = Depends(get
     if "progress_percentage" in data:
         project.progress_percentage = data["progress_percentage"]
 
-    db.commit()
-    db.refresh(project)
+    await stats.apply(db, stats.add_project(deltas, project))
+    await db.commit()
+    await db.refresh(project)
+    await shared_cache.invalidate(f"project:{project_id}", *entity_tags([project], "student", "mentor"))
+    await hub.publish(status_topic(project_id), status_event(project))
 
     return {"message": "Project updated"}
 
 
-@router.get("/mentor/{mentor_id}/students")
-def get_mentor_students(mentor_id: int, db: Session = Depends(get_db)):
-    students = db.query(Student).filter(Student.mentor_id == mentor_id).all()
+@router.put("/projects/bulk-status", response_model=BulkResult)
+async def bulk_update_project_status(data: dict, db: AsyncSession = Depends(get_db)):
+    if not isinstance(data.get("items"), list):
+        raise HTTPException(422, "items must be a list")
+    items = parse_bulk_items(BulkStatusItem, data["items"], "project_id")
+    ids = {item.project_id for _, item, _ in items if item is not None}
+    current = {
+        row.id: row for row in (await db.execute(
+            select(
+                Project.id,
+                Project.student_id,
+                Project.mentor_id,
+                Project.status,
+                Project.progress_percentage,
+                Project.mentor_feedback
+            )
+            .where(Project.id.in_(ids))
+            .with_for_update()
+        )).all()
+    } if ids else {}
+
+    changes, results = {}, []
+    for project_id, item, error in items:
+        if error is not None:
+            pass
+        elif project_id not in current:
+            error = "Project not found"
+        elif project_id in changes:
+            error = "Duplicate project_id"
+        else:
+            changes[project_id] = item
+        results.append({"id": project_id, "ok": error is None, "error": error})
+
+    if not changes:
+        return {"updated": 0, "results": results}
+
+    # One UPDATE with a CASE per column; columns an item leaves out keep their value
+    feedback = {
+        pid: item.mentor_feedback for pid, item in changes.items() if "mentor_feedback" in item.model_fields_set
+    }
+    progress = {
+        pid: item.progress_percentage for pid, item in changes.items() if "progress_percentage" in item.model_fields_set
+    }
+    values = {"status": case({pid: item.status for pid, item in changes.items()}, value=Project.id)}
+    if feedback:
+        values["mentor_feedback"] = case(feedback, value=Project.id, else_=Project.mentor_feedback)
+    if progress:
+        values["progress_percentage"] = case(progress, value=Project.id, else_=Project.progress_percentage)
+    await db.execute(
+        update(Project)
+        .where(Project.id.in_(changes))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
 
-    return [
-        {
-            "student_id": s.student_id,
-            "name": s.name,
-            "email": s.email,
-            "prn": s.prn,
-            "github_link": s.github_link
-        }
-        for s in students
-    ]
+    deltas, tags, updated = {}, [], []
+    for pid, item in changes.items():
+        old = current[pid]
+        new = SimpleNamespace(
+            id=pid,
+            mentor_id=old.mentor_id,
+            status=item.status,
+            progress_percentage=progress.get(pid, old.progress_percentage),
+            mentor_feedback=feedback.get(pid, old.mentor_feedback)
+        )
+        stats.add_project(deltas, old, -1)
+        stats.add_project(deltas, new)
+        tags += [f"project:{pid}", *entity_tags([old], "student", "mentor")]
+        updated.append(new)
+    await stats.apply(db, deltas)
+    await db.commit()
+    await shared_cache.invalidate(*tags)
+    for project in updated:
+        await hub.publish(status_topic(project.id), status_event(project))
+
+    return {"updated": len(changes), "results": results}
+
+
+@router.get("/mentor/{mentor_id}/students", response_model=list[MentorStudentOut])
+async def get_mentor_students(mentor_id: int, db: AsyncSession = Depends(get_read_db)):
+    students = await db.execute(
+        select(
+            Student.student_id,
+            Student.name,
+            Student.email,
+            Student.prn,
+            Student.github_link
+        ).where(Student.mentor_id == mentor_id)
+    )
 
+    return students.all()
+
+
+@router.get("/mentor/{mentor_id}/inbox", response_model=list[InboxEntry])
+async def get_mentor_inbox(mentor_id: int, db: AsyncSession = Depends(get_read_db)):
+    # One query over the denormalised summary and read-cursor rows, whatever the thread lengths
+    rows = await db.execute(
+        select(
+            Project.id,
+            Project.project_id,
+            Project.title,
+            Student.name.label("student_name"),
+            func.coalesce(Project.status, "Pending").label("status"),
+            ConversationSummary.last_message_preview,
+            ConversationSummary.last_sender_type,
+            ConversationSummary.last_message_at,
+            func.coalesce(ConversationSummary.message_count, 0).label("message_count"),
+            func.coalesce(MessageRead.unread_count, 0).label("unread_count")
+        )
+        .join(Student, Project.student_id == Student.student_id)
+        .outerjoin(ConversationSummary, ConversationSummary.project_id == Project.id)
+        .outerjoin(MessageRead, and_(
+            MessageRead.project_id == Project.id,
+            MessageRead.reader_type == "mentor",
+            MessageRead.reader_id == mentor_id
+        ))
+        .where(Project.mentor_id == mentor_id)
+        .order_by(
+            ConversationSummary.last_message_id.is_(None),
+            ConversationSummary.last_message_id.desc(),
+            Project.id
+        )
+    )
+    return rows.all()
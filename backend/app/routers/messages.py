@@ -1,18 +1,201 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import Message
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_read_db, open_session
+from app import receipts
+from app.models import Message, MessageRead, Project
+from app.pagination import MAX_LIMIT, PageParams, paginate
+from app.realtime import KEEPALIVE_SECONDS, Event, hub, message_topic, status_topic
+from app.schemas import ChatMessage, MessageResponse, SentMessage, UnreadCount
 
 router = APIRouter()
 
-@router.post("/")
-def send_message(data: dict, db: Session = Depends(get_db)):
+
+def message_columns():
+    return select(
+        Message.message_id,
+        Message.project_id,
+        Message.sender_type,
+        Message.sender_id,
+        Message.message_text,
+        Message.sent_at
+    )
+
+
+@router.post("/", response_model=SentMessage)
+async def send_message(data: dict, db: AsyncSession = Depends(get_db)):
+    project = await db.get(Project, data["project_id"])
+    if project is None:
+        raise HTTPException(404, "Project not found")
+
     msg = Message(**data)
     db.add(msg)
-    db.commit()
-    db.refresh(msg)
+    await db.flush()
+    await receipts.message_sent(db, msg, project)
+    await receipts.summarise(db, msg)
+    await db.commit()
+    await db.refresh(msg)
+    # Serialised once here, not per subscriber
+    await hub.publish(message_topic(msg.project_id), message_event(msg))
     return {"message": "Message sent", "data": msg}
 
-@router.get("/project/{project_id}")
-def get_project_messages(project_id: int, db: Session = Depends(get_db)):
-    return db.query(Message).filter(Message.project_id == project_id).all()
+@router.put("/read", response_model=MessageResponse)
+async def mark_messages_read(data: dict, db: AsyncSession = Depends(get_db)):
+    project_id = data["project_id"]
+    if await db.get(Project, project_id) is None:
+        raise HTTPException(404, "Project not found")
+
+    # Up to the newest message unless the client says how far it got
+    up_to = data.get("last_read_message_id") or await db.scalar(
+        select(func.max(Message.message_id)).where(Message.project_id == project_id)
+    ) or 0
+    await receipts.mark_read(db, project_id, data["reader_type"], data["reader_id"], up_to)
+    await db.commit()
+    return {"message": "Messages marked as read"}
+
+
+@router.get("/unread", response_model=list[UnreadCount])
+async def get_unread_counts(
+    reader_type: str,
+    reader_id: int,
+    db: AsyncSession = Depends(get_read_db)
+):
+    rows = await db.execute(
+        select(MessageRead.project_id, MessageRead.unread_count, MessageRead.last_read_message_id)
+        .where(MessageRead.reader_type == reader_type, MessageRead.reader_id == reader_id)
+        .order_by(MessageRead.project_id)
+    )
+    return rows.all()
+
+
+@router.get("/project/{project_id}", response_model=list[ChatMessage])
+async def get_project_messages(
+    project_id: int,
+    response: Response,
+    after_message_id: Optional[int] = None,
+    before_message_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # Refreshes ask for what follows their newest message (after_message_id);
+    # scrolling back asks for the `limit` messages preceding the oldest (before_message_id)
+    stmt = message_columns().where(Message.project_id == project_id)
+    if after_message_id is not None:
+        stmt = stmt.where(Message.message_id > after_message_id)
+    if before_message_id is not None:
+        rows = await paginate(
+            db, stmt.where(Message.message_id < before_message_id), page, response,
+            order_by=[Message.message_id.desc()]
+        )
+        return rows[::-1]
+
+    return await paginate(db, stmt, page, response, order_by=[Message.message_id])
+
+
+def message_event(message):
+    return Event("message", message.message_id, ChatMessage.model_validate(message).model_dump_json())
+
+
+async def missed_messages(project_id, after_message_id):
+    """Messages posted since the client's last one, for (re)connecting streams."""
+    if after_message_id is None:
+        return []
+    # A short-lived session: streams must not pin a pooled connection while idle
+    db = open_session(read_only=True)
+    try:
+        rows = await db.execute(
+            message_columns()
+            .where(Message.project_id == project_id, Message.message_id > after_message_id)
+            .order_by(Message.message_id)
+            .limit(MAX_LIMIT)
+        )
+        return [message_event(row) for row in rows]
+    finally:
+        await db.close()
+
+
+@router.websocket("/project/{project_id}/ws")
+async def project_messages_ws(
+    websocket: WebSocket,
+    project_id: int,
+    after_message_id: Optional[int] = None
+):
+    await websocket.accept()
+    # Subscribe before reading the backlog so nothing posted in between is lost
+    subscription = hub.subscribe(message_topic(project_id))
+    receiver = asyncio.ensure_future(websocket.receive())
+    getter = asyncio.ensure_future(subscription.get())
+    try:
+        for event in await missed_messages(project_id, after_message_id):
+            await websocket.send_text(event.data)
+
+        while True:
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            # Both can finish in the same round; the getter has already taken its
+            # event off the queue, so send it before looking at the receiver
+            if getter in done:
+                event = getter.result()
+                if event is None:
+                    # Too slow to keep up; it reconnects with after_message_id and catches up
+                    await websocket.close(code=1013)
+                    return
+                await websocket.send_text(event.data)
+                getter = asyncio.ensure_future(subscription.get())
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    return
+                # Clients have nothing to say on this channel; ignore and keep listening
+                receiver = asyncio.ensure_future(websocket.receive())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        getter.cancel()
+        hub.unsubscribe(subscription)
+
+
+@router.get("/project/{project_id}/events")
+async def project_messages_sse(
+    project_id: int,
+    request: Request,
+    after_message_id: Optional[int] = None,
+    last_event_id: Optional[int] = Header(None)
+):
+    """Server-sent events fallback for clients that cannot open a WebSocket.
+
+    Carries status changes too, as `event: status`, which plain onmessage
+    handlers do not see.
+    """
+    async def events():
+        subscription = hub.subscribe(message_topic(project_id), status_topic(project_id))
+        try:
+            yield ": connected\n\n"
+            for event in await missed_messages(project_id, last_event_id or after_message_id):
+                yield sse(event)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    # Dropped for falling behind; EventSource reconnects with Last-Event-ID
+                    return
+                yield sse(event)
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def sse(event):
+    if event.kind == "message":
+        return f"id: {event.id}\ndata: {event.data}\n\n"
+    return f"event: {event.kind}\ndata: {event.data}\n\n"
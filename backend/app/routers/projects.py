@@ -1,22 +1,19 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
-from app.models import Project
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import stats
+from app.cache import entity_tags, shared_cache
+from app.conditional import conditional
+from app.database import get_db, get_read_db, reads_from_primary
 import random
 from app.models import Project, Student, Mentor
+from app.schemas import MessageResponse, ProjectDetail, StudentProjectOut
 from fastapi import HTTPException
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-@router.post("/")
-def create_project(data: dict, db: Session = Depends(get_db)):
+@router.post("/", response_model=MessageResponse)
+async def create_project(data: dict, db: AsyncSession = Depends(get_db)):
     pid = f"PRJ{random.randint(1000,9999)}"
     project = Project(
         project_id=pid,
@@ -31,92 +28,100 @@ def create_project(data: dict, db: Session = Depends(get_db)):
     )
 
     db.add(project)
-    db.commit()
+    await stats.apply(db, stats.add_project({}, project))
+    await db.commit()
+    await shared_cache.invalidate(*entity_tags([project], "student", "mentor"))
     return {"message": "Project created"}
 
-from app.models import Project, Mentor
-
-@router.get("/student/{student_id}")
-def student_projects(student_id: int, db: Session = Depends(get_db)):
-    projects = (
-        db.query(Project, Student, Mentor)
-        .join(Student, Project.student_id == Student.student_id)
-        .outerjoin(Mentor, Project.mentor_id == Mentor.mentor_id)
-        .filter(Project.student_id == student_id)
-        .all()
+@router.get("/student/{student_id}", response_model=list[StudentProjectOut])
+async def student_projects(
+    student_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
+):
+    async def load(session):
+        rows = (await session.execute(
+            select(
+                Project.id,
+                Project.project_id,
+                Project.title,
+                Project.description,
+                Student.name.label("student_name"),
+                Mentor.name.label("mentor_name"),
+                Project.status,
+                Project.progress_percentage,
+                Project.github_link,
+                Project.mentor_feedback,
+                Project.last_updated,
+                Project.submission_date,
+                Project.mentor_id
+            )
+            .join(Student, Project.student_id == Student.student_id)
+            .outerjoin(Mentor, Project.mentor_id == Mentor.mentor_id)
+            .where(Project.student_id == student_id)
+        )).all()
+        tags = [f"student:{student_id}", *entity_tags(rows, "mentor")]
+        return [row._asdict() for row in rows], tags
+
+    rows = await shared_cache.get_or_load(
+        request.url.path, load, db, sticky=reads_from_primary(request)
     )
-
-    result = []
-    for p, s, m in projects:
-        result.append({
-            "id": p.id,
-            "project_id": p.project_id,
-            "title": p.title,
-            "description": p.description,
-            "student_name": s.name,
-            "mentor_name": m.name if m else None,
-            "status": p.status,
-            "progress_percentage": p.progress_percentage,
-            "github_link": p.github_link,
-            "mentor_feedback": p.mentor_feedback,
-            "last_updated": p.last_updated,
-            "submission_date": p.submission_date
-        })
-
-    return result
-
-
-@router.get("/{project_id}")
-def get_project(project_id: int, db: Session = Depends(get_db)):
-    project = (
-        db.query(
-            Project.id,
-            Project.project_id,
-            Project.title,
-            Project.description,
-            Project.github_link,
-            Project.status,
-            Project.progress_percentage,
-            Project.mentor_feedback,
-            Project.last_updated,
-            Student.name.label("student_name"),
-            Mentor.name.label("mentor_name")
+    return conditional(request, response, rows)
+
+
+@router.get("/{project_id}", response_model=ProjectDetail)
+async def get_project(project_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    async def load(session):
+        result = await session.execute(
+            select(
+                Project.id,
+                Project.project_id,
+                Project.title,
+                Project.description,
+                Project.github_link,
+                Project.status,
+                Project.progress_percentage,
+                Project.mentor_feedback,
+                Project.last_updated,
+                Student.name.label("student_name"),
+                Mentor.name.label("mentor_name"),
+                Project.student_id,
+                Project.mentor_id
+            )
+            .join(Student, Student.student_id == Project.student_id)
+            .outerjoin(Mentor, Mentor.mentor_id == Project.mentor_id)
+            .where(Project.id == project_id)
         )
-        .join(Student, Student.student_id == Project.student_id)
-        .outerjoin(Mentor, Mentor.mentor_id == Project.mentor_id)
-        .filter(Project.id == project_id)
-        .first()
-    )
+        project = result.first()
 
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        return project._asdict(), [f"project:{project_id}", *entity_tags([project], "student", "mentor")]
 
-    return {
-        "id": project.id,
-        "project_id": project.project_id,
-        "title": project.title,
-        "description": project.description,
-        "github_link": project.github_link,
-        "status": project.status,
-        "progress_percentage": project.progress_percentage,
-        "mentor_feedback": project.mentor_feedback,
-        "last_updated": project.last_updated,
-        "student_name": project.student_name,
-        "mentor_name": project.mentor_name
-    }
-
-@router.put("/{project_id}")
-def update_project(project_id: int, data: dict, db: Session = Depends(get_db)):
-    project = db.query(Project).filter(Project.id == project_id).first()
+    return await shared_cache.get_or_load(
+        request.url.path, load, db, sticky=reads_from_primary(request)
+    )
+
+@router.put("/{project_id}", response_model=MessageResponse)
+async def update_project(project_id: int, data: dict, db: AsyncSession = Depends(get_db)):
+    project = await db.get(Project, project_id, with_for_update=True)
+    before = entity_tags([project], "student", "mentor")
+    deltas = stats.add_project({}, project, -1)
     for key, value in data.items():
         setattr(project, key, value)
-    db.commit()
+    await stats.apply(db, stats.add_project(deltas, project))
+    await db.commit()
+    await shared_cache.invalidate(
+        f"project:{project_id}", *before, *entity_tags([project], "student", "mentor")
+    )
     return {"message": "Updated"}
 
 
-@router.delete("/projects/{project_id}")
-def delete_project(project_id: int, db: Session = Depends(get_db)):
-    project = db.query(Project).filter(Project.id == project_id).first()
+@router.delete("/projects/{project_id}", response_model=MessageResponse)
+async def delete_project(project_id: int, db: AsyncSession = Depends(get_db)):
+    project = await db.get(Project, project_id, with_for_update=True)
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -125,7 +130,9 @@ def delete_project(project_id: int, db: Session = Depends(get_db)):
     if project.status == "Approved":
         raise HTTPException(status_code=403, detail="Approved projects cannot be deleted")
 
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await stats.apply(db, stats.add_project({}, project, -1))
+    await db.commit()
+    await shared_cache.invalidate(f"project:{project_id}", *entity_tags([project], "student", "mentor"))
 
     return {"message": "Project deleted successfully"}
\ No newline at end of file
@@ -1,16 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_read_db
 from app.models import Student
+from app.pagination import PageParams, paginate
+from app.schemas import MessageResponse, StudentOut
 
 router = APIRouter()
 
-@router.post("/login")
-def student_login(data: dict, db: Session = Depends(get_db)):
-    student = db.query(Student).filter(
-        Student.email == data["username"],
-        Student.password == data["password"]
-    ).first()
+@router.post("/login", response_model=StudentOut)
+async def student_login(data: dict, db: AsyncSession = Depends(get_db)):
+    student = await db.scalar(
+        select(Student).where(
+            Student.email == data["username"],
+            Student.password == data["password"]
+        )
+    )
 
     if not student:
         raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -24,18 +29,34 @@ def student_login(data: dict, db: Session = Depends(get_db)):
         "github_link": student.github_link
     }
 
-@router.get("/student")
-def get_students(db: Session = Depends(get_db)):
-    return db.query(Student).all()
-
-
-@router.put("/{student_id}/github")
-def update_github(student_id: int, data: dict, db: Session = Depends(get_db)):
-    student = db.query(Student).filter(Student.student_id == student_id).first()
+@router.get("/student", response_model=list[StudentOut])
+async def get_students(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db)
+):
+    return await paginate(
+        db,
+        select(
+            Student.student_id,
+            Student.name,
+            Student.prn,
+            Student.email,
+            Student.mentor_id,
+            Student.github_link
+        ),
+        page, response,
+        order_by=[Student.student_id]
+    )
+
+
+@router.put("/{student_id}/github", response_model=MessageResponse)
+async def update_github(student_id: int, data: dict, db: AsyncSession = Depends(get_db)):
+    student = await db.get(Student, student_id)
 
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
     student.github_link = data["github_link"]
-    db.commit()
+    await db.commit()
     return {"message": "GitHub updated"}
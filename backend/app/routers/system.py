@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from app.cache import CACHES, shared_cache
+from app.pool import pool_status
+from app.realtime import hub
+from app.schemas import CacheStatus, PoolStatus, RealtimeStatus
+
+router = APIRouter()
+
+
+@router.get("/pool", response_model=list[PoolStatus])
+async def get_pool_status():
+    return pool_status()
+
+
+@router.get("/cache", response_model=list[CacheStatus])
+async def get_cache_status():
+    return [cache.stats() for cache in CACHES]
+
+
+@router.get("/realtime", response_model=RealtimeStatus)
+async def get_realtime_status():
+    return {
+        **hub.stats(),
+        "invalidate_errors": shared_cache.invalidate_errors,
+        "broker": hub.broker.health(),
+        "cache": shared_cache.backend.health(),
+    }
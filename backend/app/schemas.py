@@ -0,0 +1,267 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+
+class ORMModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+
+class MessageResponse(BaseModel):
+    message: str
+
+
+class AdminLoginOut(BaseModel):
+    admin_id: int
+    username: str
+
+
+class MentorOut(ORMModel):
+    mentor_id: int
+    name: str
+    email: str
+    department: Optional[str] = None
+
+
+class MentorLoginOut(MentorOut):
+    id: int
+    userType: str
+
+
+class StudentOut(ORMModel):
+    student_id: int
+    name: str
+    prn: str
+    email: str
+    mentor_id: Optional[int] = None
+    github_link: Optional[str] = None
+
+
+class AdminStudentOut(StudentOut):
+    mentor_name: Optional[str] = None
+
+
+class MentorStudentOut(ORMModel):
+    student_id: int
+    name: str
+    email: str
+    prn: str
+    github_link: Optional[str] = None
+
+
+class AdminProjectOut(ORMModel):
+    id: int
+    project_id: str
+    title: str
+    student_name: str
+    mentor_name: Optional[str] = None
+    status: str
+    github_link: Optional[str] = None
+    last_updated: Optional[datetime] = None
+
+
+class MentorProjectOut(ORMModel):
+    id: int
+    project_id: str
+    title: str
+    student_name: str
+    github_link: Optional[str] = None
+    status: str
+    progress_percentage: int
+    mentor_feedback: str
+    last_updated: Optional[datetime] = None
+
+
+class ProjectDetail(ORMModel):
+    id: int
+    project_id: str
+    title: str
+    description: Optional[str] = None
+    github_link: Optional[str] = None
+    status: str
+    progress_percentage: int
+    mentor_feedback: Optional[str] = None
+    last_updated: Optional[datetime] = None
+    student_name: str
+    mentor_name: Optional[str] = None
+
+
+class StudentProjectOut(ProjectDetail):
+    submission_date: Optional[datetime] = None
+
+
+class MentorLoad(ORMModel):
+    mentor_id: int
+    name: str
+    department: Optional[str] = None
+    student_count: int
+
+
+class DepartmentProgress(ORMModel):
+    department: Optional[str] = None
+    project_count: int
+    average_progress: float
+
+
+class AdminSummary(BaseModel):
+    total_students: int
+    unassigned_students: int
+    total_mentors: int
+    total_projects: int
+    projects_by_status: dict[str, int]
+    students_per_mentor: list[MentorLoad]
+    progress_by_department: list[DepartmentProgress]
+
+
+class RowError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class ImportResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: list[RowError]
+
+
+class BulkStatusItem(BaseModel):
+    project_id: int
+    status: str = Field(min_length=1, max_length=30)
+    # Left out: the column keeps its value (see model_fields_set)
+    progress_percentage: int = Field(0, ge=0, le=100)
+    mentor_feedback: Optional[str] = None
+
+
+class BulkAssignItem(BaseModel):
+    student_id: int
+    # None unassigns
+    mentor_id: Optional[int] = None
+
+
+def parse_bulk_items(model, items, id_field):
+    """Validates each item of a bulk request on its own, so one bad item fails only itself.
+
+    Returns [(id, item, error)]: `item` is a `model` or None, `id` whatever id the
+    raw item carried (for the result row) and `error` a message or None.
+    """
+    parsed = []
+    for raw in items:
+        try:
+            item = model.model_validate(raw)
+            parsed.append((getattr(item, id_field), item, None))
+        except ValidationError as e:
+            raw_id = raw.get(id_field) if isinstance(raw, dict) else None
+            error = "; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" if err["loc"] else err["msg"]
+                for err in e.errors()
+            )
+            parsed.append((raw_id if type(raw_id) is int else None, None, error))
+    return parsed
+
+
+class BulkItemResult(BaseModel):
+    id: Optional[int] = None
+    ok: bool
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    updated: int
+    results: list[BulkItemResult]
+
+
+class Assignment(BaseModel):
+    student_id: int
+    mentor_id: int
+
+
+class MentorLoadChange(BaseModel):
+    mentor_id: int
+    before: int
+    after: int
+
+
+class AutoAssignResult(BaseModel):
+    dry_run: bool
+    assigned: int
+    left_unassigned: list[int]
+    loads: list[MentorLoadChange]
+    assignments: list[Assignment]
+
+
+class ChatMessage(ORMModel):
+    message_id: int
+    project_id: Optional[int] = None
+    sender_type: Optional[str] = None
+    sender_id: Optional[int] = None
+    message_text: Optional[str] = None
+    sent_at: Optional[datetime] = None
+
+
+class SentMessage(BaseModel):
+    message: str
+    data: ChatMessage
+
+
+class UnreadCount(ORMModel):
+    project_id: int
+    unread_count: int
+    last_read_message_id: int
+
+
+class InboxEntry(ORMModel):
+    id: int
+    project_id: str
+    title: str
+    student_name: str
+    status: str
+    last_message_preview: Optional[str] = None
+    last_sender_type: Optional[str] = None
+    last_message_at: Optional[datetime] = None
+    message_count: int
+    unread_count: int
+
+
+class PoolStatus(BaseModel):
+    name: str
+    pool_size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    connects: int
+    checkout_timeouts: int
+    wait_total_ms: float
+    wait_avg_ms: float
+    wait_max_ms: float
+
+
+class ListenerStatus(BaseModel):
+    channel: Optional[str]
+    listening: bool
+    connected: bool
+    errors: int
+    last_error: Optional[str]
+
+
+class RealtimeStatus(BaseModel):
+    topics: int
+    subscribers: int
+    queue_size: int
+    topic_buffer: int
+    dropped: int
+    publish_errors: int
+    invalidate_errors: int
+    broker: ListenerStatus
+    cache: ListenerStatus
+
+
+class CacheStatus(BaseModel):
+    name: str
+    size: int
+    maxsize: int
+    ttl: float
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
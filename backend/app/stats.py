@@ -0,0 +1,144 @@
+import argparse
+import sys
+from sqlalchemy import delete, func, insert, select, update
+from app.database import engine, upsert
+from app.models import Mentor, Project, ProjectStat, Student
+
+# mentor_id of the stats rows counting projects that have no mentor
+NO_MENTOR = 0
+
+
+def add_project(deltas, project, sign=1):
+    """Records `project` entering (sign=1) or leaving (sign=-1) its stats row in `deltas`."""
+    key = (project.mentor_id or NO_MENTOR, project.status or "Pending")
+    count, progress = deltas.get(key, (0, 0))
+    deltas[key] = (count + sign, progress + sign * (project.progress_percentage or 0))
+    return deltas
+
+
+def increment(mentor_id, status, count, progress):
+    return upsert(
+        ProjectStat,
+        {
+            "mentor_id": mentor_id,
+            "status": status,
+            "department": select(Mentor.department)
+            .where(Mentor.mentor_id == mentor_id).scalar_subquery(),
+            "project_count": count,
+            "progress_total": progress,
+        },
+        {
+            "project_count": ProjectStat.project_count + count,
+            "progress_total": ProjectStat.progress_total + progress,
+        },
+    )
+
+
+async def apply(db, deltas):
+    """Applies `deltas` in the caller's transaction, so counters commit with the write."""
+    # Fixed key order keeps concurrent writers from deadlocking on the rows
+    for (mentor_id, status), (count, progress) in sorted(deltas.items()):
+        if count or progress:
+            await db.execute(increment(mentor_id, status, count, progress))
+
+
+async def lock_projects(db, owner, where):
+    """Locks `owner` and the projects matching `where` until the caller's transaction ends.
+
+    Taken before a delete that cascades: the owner's lock keeps new projects out
+    (their foreign key check waits on it) and the project locks wait out status
+    changes in flight, so the counts read next are the ones the cascade removes.
+    """
+    await db.execute(select(owner).where(where(owner)).with_for_update())
+    return await db.execute(
+        select(Project.mentor_id, Project.status, Project.progress_percentage)
+        .where(where(Project))
+        .with_for_update()
+    )
+
+
+async def student_deltas(db, student_id):
+    """Deltas removing every project of a student, for deletes that cascade in the database."""
+    deltas = {}
+    for project in await lock_projects(db, Student, lambda t: t.student_id == student_id):
+        add_project(deltas, project, -1)
+    return deltas
+
+
+async def forget_mentor(db, mentor_id):
+    """Drops a mentor's counters; call before deleting the mentor, in the same transaction."""
+    await lock_projects(db, Mentor, lambda t: t.mentor_id == mentor_id)
+    await db.execute(delete(ProjectStat).where(ProjectStat.mentor_id == mentor_id))
+
+
+async def set_department(db, mentor_id, department):
+    await db.execute(
+        update(ProjectStat).where(ProjectStat.mentor_id == mentor_id).values(department=department)
+    )
+
+
+def aggregate():
+    """project_stats recomputed from projects, one row per (mentor, status)."""
+    mentor_id = func.coalesce(Project.mentor_id, NO_MENTOR)
+    status = func.coalesce(Project.status, "Pending")
+    return (
+        select(
+            mentor_id.label("mentor_id"),
+            status.label("status"),
+            Mentor.department,
+            func.count(Project.id).label("project_count"),
+            func.coalesce(func.sum(func.coalesce(Project.progress_percentage, 0)), 0)
+            .label("progress_total")
+        )
+        .outerjoin(Mentor, Project.mentor_id == Mentor.mentor_id)
+        .group_by(Project.mentor_id, Project.status, Mentor.department)
+    )
+
+
+def rebuild(conn):
+    conn.execute(delete(ProjectStat))
+    conn.execute(insert(ProjectStat).from_select(
+        ["mentor_id", "status", "department", "project_count", "progress_total"], aggregate()
+    ))
+
+
+def check(conn):
+    """Differences between project_stats and a fresh aggregate; empty when consistent."""
+    expected = {
+        (r.mentor_id, r.status): (r.department, r.project_count, r.progress_total)
+        for r in conn.execute(aggregate())
+    }
+    actual = {
+        (r.mentor_id, r.status): (r.department, r.project_count, r.progress_total)
+        for r in conn.execute(select(ProjectStat))
+        if r.project_count or r.progress_total
+    }
+    return [
+        f"mentor {mentor_id} / {status}: "
+        f"stored {actual.get((mentor_id, status))}, actual {expected.get((mentor_id, status))}"
+        for mentor_id, status in sorted(expected.keys() | actual.keys())
+        if expected.get((mentor_id, status)) != actual.get((mentor_id, status))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.stats")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        with engine.begin() as conn:
+            rebuild(conn)
+        print("project_stats rebuilt")
+    else:
+        with engine.connect() as conn:
+            problems = check(conn)
+        for problem in problems:
+            print(problem)
+        if problems:
+            sys.exit(1)
+        print("project_stats is consistent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Admin list endpoints with 200k students: unfiltered first pages vs filtered, paged queries.
+
+    python -m bench.admin_filters [--students 200000]
+"""
+import argparse
+from bench.common import use_database, seed, timed, table
+
+MENTORS = 2000
+
+REQUESTS = [
+    ("none (default page)", "/admin/students"),
+    ("none (default page)", "/admin/projects"),
+    ("mentor", "/admin/students?mentor_id=7&limit=50"),
+    ("department", "/admin/students?department=IT&limit=50"),
+    ("name prefix", "/admin/students?q=Student%200001&limit=50"),
+    ("sort by name", "/admin/students?sort=name&limit=50"),
+    ("status + mentor", "/admin/projects?status=Approved&mentor_id=7&limit=50"),
+    ("department", "/admin/projects?department=CS&sort=title&limit=50"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.admin_filters")
+    parser.add_argument("--students", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("database:", use_database())
+    seed(MENTORS, max(args.students // MENTORS, 1), projects_per_student=1)
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    rows = []
+    with TestClient(app) as client:
+        for label, url in REQUESTS:
+            ms, response = timed(lambda: client.get(url), args.repeat)
+            response.raise_for_status()
+            rows.append([label, url, f"{ms:.1f}", len(response.json()), f"{len(response.content) / 1024:.1f}"])
+    table(["filter", "request", "median ms", "rows", "KiB"], rows)
+
+
+if __name__ == "__main__":
+    main()
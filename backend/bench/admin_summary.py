@@ -0,0 +1,52 @@
+"""Dashboard counters: GET /admin/summary vs fetching the three full lists and counting client-side.
+
+    python -m bench.admin_summary [--students 20000]
+"""
+import argparse
+from bench.common import use_database, seed, timed, table
+
+MENTORS = 500
+PROJECTS_PER_STUDENT = 2
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.admin_summary")
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print("database:", use_database())
+    seed(MENTORS, max(args.students // MENTORS, 1), PROJECTS_PER_STUDENT)
+
+    from fastapi.testclient import TestClient
+    from app.cache import mentor_cache
+    from app.main import app
+    from app.pagination import MAX_LIMIT
+
+    def all_pages(url):
+        # What the dashboard's list views do: follow X-Next-Cursor to the last page
+        pages, params = [], {"limit": MAX_LIMIT}
+        while True:
+            pages.append(client.get(url, params=params))
+            cursor = pages[-1].headers.get("X-Next-Cursor")
+            if cursor is None:
+                return pages
+            params = {"limit": MAX_LIMIT, "cursor": cursor}
+
+    def full_lists():
+        # The mentor directory is cached; count its real cost every time
+        mentor_cache.clear()
+        return [page for url in ("/admin/students", "/admin/mentors", "/admin/projects") for page in all_pages(url)]
+
+    with TestClient(app) as client:
+        lists_ms, responses = timed(full_lists, args.repeat)
+        summary_ms, summary = timed(lambda: client.get("/admin/summary"), args.repeat)
+
+    table(["source", "median ms", "requests", "KiB"], [
+        ["three full lists", f"{lists_ms:.1f}", len(responses), f"{sum(len(r.content) for r in responses) / 1024:.0f}"],
+        ["/admin/summary", f"{summary_ms:.1f}", 1, f"{len(summary.content) / 1024:.1f}"],
+    ])
+
+
+if __name__ == "__main__":
+    main()
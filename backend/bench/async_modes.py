@@ -0,0 +1,83 @@
+"""Requests/sec of a read endpoint at 50/200/1000 concurrent clients, DB_ASYNC=1 vs DB_ASYNC=0.
+
+Each mode runs in its own single-worker uvicorn process against the same seeded database:
+    python -m bench.async_modes [--concurrency 50 200 1000] [--seconds 10]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import httpx
+from bench.common import use_database, seed, table
+
+MENTORS = 50
+STUDENTS_PER_MENTOR = 20
+
+
+def serve(db_async, port):
+    env = dict(os.environ, DB_ASYNC=db_async)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/system/pool")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def load(port, concurrency, seconds):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    done, errors = 0, 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(n, http):
+        nonlocal done, errors
+        while time.perf_counter() < deadline:
+            mentor_id = (n + done) % MENTORS + 1
+            try:
+                response = await http.get(f"/faculty/mentor/{mentor_id}/students")
+                response.raise_for_status()
+                done += 1
+            except httpx.HTTPError:
+                errors += 1
+
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+    ) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(n, http) for n in range(concurrency)))
+        return done / (time.perf_counter() - start), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.async_modes")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8790)
+    args = parser.parse_args()
+
+    print("database:", use_database())
+    seed(MENTORS, STUDENTS_PER_MENTOR, projects_per_student=2)
+
+    rows = []
+    for db_async in ("1", "0"):
+        server = serve(db_async, args.port)
+        try:
+            for concurrency in args.concurrency:
+                rps, errors = asyncio.run(load(args.port, concurrency, args.seconds))
+                rows.append([f"DB_ASYNC={db_async}", concurrency, f"{rps:.0f}", errors])
+        finally:
+            server.terminate()
+            server.wait()
+    table(["mode", "clients", "req/s", "errors"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Balanced mentor assignment at several scales.
+
+Times assignment.balance() alone for each (students, mentors) scale, then POST /admin/auto-assign
+(dry run and commit) against a seeded database at the largest scale given:
+    python -m bench.auto_assign [--scales 1000x50 10000x500 50000x2000]
+"""
+import argparse
+import random
+import time
+from bench.common import use_database, seed, timed, table
+
+
+def scale(value):
+    students, mentors = value.lower().split("x")
+    return int(students), int(mentors)
+
+
+def spread(loads):
+    return max(loads) - min(loads)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.auto_assign")
+    parser.add_argument("--scales", type=scale, nargs="+", default=[(1_000, 50), (10_000, 500), (50_000, 2_000)])
+    args = parser.parse_args()
+
+    print("database:", use_database())
+    from app.assignment import balance
+
+    rows = []
+    rng = random.Random(20)
+    for students, mentors in args.scales:
+        # Lopsided starting loads, a fifth of the mentors with a capacity
+        loads = {m: rng.randint(0, 40) for m in range(1, mentors + 1)}
+        capacities = {m: loads[m] + 5 for m in rng.sample(sorted(loads), mentors // 5)}
+        ms, (assignments, leftover) = timed(
+            lambda: balance(loads, list(range(students)), capacities), repeat=3
+        )
+        after = dict(loads)
+        for _, mentor_id in assignments:
+            after[mentor_id] += 1
+        uncapped = [after[m] for m in after if m not in capacities]
+        rows.append([f"{students}x{mentors}", f"{ms:.1f}", len(assignments), len(leftover),
+                     spread(loads.values()), spread(uncapped)])
+    table(["students x mentors", "balance ms", "assigned", "left over", "spread before",
+           "spread after (uncapped)"], rows)
+
+    students, mentors = max(args.scales)
+    seed(mentors, students // mentors)
+
+    from sqlalchemy import update
+    from fastapi.testclient import TestClient
+    from app.database import engine
+    from app.main import app
+    from app.models import Student
+
+    # Unassign most students of every other mentor so the loads start uneven
+    with engine.begin() as conn:
+        conn.execute(
+            update(Student)
+            .where(Student.mentor_id % 2 == 0, Student.student_id % 3 != 0)
+            .values(mentor_id=None)
+        )
+
+    with TestClient(app) as client:
+        rows = []
+        for dry_run in (True, False):
+            start = time.perf_counter()
+            result = client.post("/admin/auto-assign", json={"dry_run": dry_run})
+            result.raise_for_status()
+            body = result.json()
+            rows.append([
+                "dry run" if dry_run else "commit", f"{(time.perf_counter() - start) * 1000:.0f}",
+                body["assigned"], spread([m["after"] for m in body["loads"]]),
+            ])
+    table(["POST /admin/auto-assign", "ms", "assigned", "spread after"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Memory and latency of a 50k-row project list: full ORM entities vs labeled column rows.
+
+"entities" is the old get_projects (Project, Student and Mentor entities copied into dicts),
+"columns" is projects_query as the admin router runs it now. Both are timed under tracemalloc,
+which slows them alike:
+    python -m bench.column_loads [--rows 50000]
+"""
+import argparse
+import time
+import tracemalloc
+from bench.common import use_database, seed, table
+
+STUDENTS_PER_MENTOR = 50
+# Typical sizes of the Text columns the entity load drags along
+DESCRIPTION = "Project description. " * 25
+FEEDBACK = "Mentor feedback. " * 10
+
+
+def load_entities(session):
+    from app.models import Mentor, Project, Student
+
+    results = (
+        session.query(Project, Student, Mentor)
+        .join(Student, Project.student_id == Student.student_id)
+        .outerjoin(Mentor, Project.mentor_id == Mentor.mentor_id)
+        .all()
+    )
+    return [
+        {
+            "id": project.id,
+            "project_id": project.project_id,
+            "title": project.title,
+            "student_name": student.name,
+            "mentor_name": mentor.name if mentor else None,
+            "status": project.status,
+            "github_link": project.github_link,
+            "last_updated": project.last_updated,
+        }
+        for project, student, mentor in results
+    ]
+
+
+def load_columns(session):
+    from app.routers.admin import projects_query
+
+    return [row._asdict() for row in session.execute(projects_query())]
+
+
+def measure(load):
+    from app.database import SessionLocal
+
+    with SessionLocal() as session:
+        tracemalloc.start()
+        start = time.perf_counter()
+        rows = load(session)
+        elapsed = (time.perf_counter() - start) * 1000
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.column_loads")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("database:", use_database())
+    seed(max(args.rows // STUDENTS_PER_MENTOR, 1), STUDENTS_PER_MENTOR, projects_per_student=1)
+
+    from sqlalchemy import update
+    from app.database import engine
+    from app.models import Project
+
+    with engine.begin() as conn:
+        conn.execute(update(Project).values(description=DESCRIPTION, mentor_feedback=FEEDBACK))
+
+    rows = []
+    for label, load in (("entities", load_entities), ("columns", load_columns)):
+        runs = sorted(measure(load) for _ in range(args.repeat))
+        elapsed, peak, count = runs[len(runs) // 2]
+        rows.append([label, count, f"{elapsed:.0f}", f"{peak / 2**20:.1f}"])
+    table(["load", "rows", "median ms", "peak MiB"], rows)
+
+
+if __name__ == "__main__":
+    main()
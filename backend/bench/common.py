@@ -0,0 +1,85 @@
+"""Shared setup for the benchmarks: a throwaway database, bulk seeding and timing helpers.
+
+Run any benchmark from backend/ as `python -m bench.<name>`. Without DATABASE_URL each run
+gets a fresh SQLite file; point DATABASE_URL at MySQL to measure the production engine.
+"""
+import os
+import statistics
+import tempfile
+import time
+from sqlalchemy import delete
+
+STATUSES = ["Pending", "In Progress", "Approved", "Completed"]
+DEPARTMENTS = ["CS", "IT", "ENTC", "MECH"]
+CHUNK = 10_000
+
+
+def use_database():
+    """Points the app at a fresh SQLite file unless DATABASE_URL is set; call before importing app."""
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="pmms-bench-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("DB_SCHEMA_MODE", "upgrade")
+    return os.environ["DATABASE_URL"]
+
+
+def insert_chunks(conn, table, rows):
+    rows = list(rows)
+    for start in range(0, len(rows), CHUNK):
+        conn.execute(table.insert(), rows[start:start + CHUNK])
+
+
+def seed(mentors, students_per_mentor, projects_per_student=0, messages_per_project=0):
+    """Bulk-inserts a mentor/student/project/message tree and rebuilds the derived tables."""
+    from app import migrations, receipts, stats
+    from app.database import engine
+    from app.models import Mentor, Student, Project, Message, MessageRead, ConversationSummary
+
+    migrations.upgrade()
+    with engine.begin() as conn:
+        insert_chunks(conn, Mentor.__table__, (
+            {"mentor_id": m, "name": f"Mentor {m:05d}", "email": f"mentor{m}@bench",
+             "password": "x", "department": DEPARTMENTS[m % len(DEPARTMENTS)]}
+            for m in range(1, mentors + 1)
+        ))
+        students = mentors * students_per_mentor
+        insert_chunks(conn, Student.__table__, (
+            {"student_id": s, "name": f"Student {s:07d}", "prn": f"PRN{s:07d}",
+             "email": f"student{s}@bench", "password": "x",
+             "mentor_id": (s - 1) // students_per_mentor + 1}
+            for s in range(1, students + 1)
+        ))
+        projects = students * projects_per_student
+        insert_chunks(conn, Project.__table__, (
+            {"id": p, "project_id": f"PRJ{p:07d}", "title": f"Project {p}",
+             "description": "Benchmark project", "student_id": (p - 1) // projects_per_student + 1,
+             "mentor_id": ((p - 1) // projects_per_student) // students_per_mentor + 1,
+             "status": STATUSES[p % len(STATUSES)], "progress_percentage": p % 101}
+            for p in range(1, projects + 1)
+        ))
+        insert_chunks(conn, Message.__table__, (
+            {"project_id": (n - 1) // messages_per_project + 1, "sender_type": ("student", "mentor")[n % 2],
+             "sender_id": 1, "message_text": f"Message {n}"}
+            for n in range(1, projects * messages_per_project + 1)
+        ))
+        stats.rebuild(conn)
+        conn.execute(delete(MessageRead))
+        conn.execute(delete(ConversationSummary))
+        receipts.backfill(conn)
+        receipts.backfill_summaries(conn)
+
+
+def timed(fn, repeat=5):
+    """Median wall time of `fn()` in milliseconds, and its last return value."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def table(headers, rows):
+    widths = [max(len(str(v)) for v in column) for column in zip(headers, *rows)]
+    for line in [headers, ["-" * w for w in widths], *rows]:
+        print("  ".join(str(v).rjust(w) for v, w in zip(line, widths)))
@@ -0,0 +1,60 @@
+"""CPU cost vs bytes saved when compressing /admin/projects bodies of 1k/10k/100k rows.
+
+Bodies are the orjson output of projects_query on a seeded database, compressed with the encoders
+CompressionMiddleware uses, in one piece as for a regular (non-streamed) response:
+    python -m bench.compression [--rows 1000 10000 100000]
+"""
+import argparse
+import time
+import orjson
+from bench.common import use_database, seed, table
+
+STUDENTS_PER_MENTOR = 50
+GZIP_LEVELS = [1, 4, 6, 9]
+# Quality 10-11 take seconds per megabyte, too slow to run per request
+BROTLI_QUALITIES = [1, 4, 6, 9]
+
+
+def cpu_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        result = fn()
+        samples.append((time.process_time() - start) * 1000)
+    return min(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.compression")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("database:", use_database())
+    seed(max(max(args.rows) // STUDENTS_PER_MENTOR, 1), STUDENTS_PER_MENTOR, projects_per_student=1)
+
+    from app.compression import BrotliEncoder, GzipEncoder, brotli
+    from app.database import engine
+    from app.routers.admin import projects_query
+
+    encoders = [(f"gzip {level}", lambda level=level: GzipEncoder(level)) for level in GZIP_LEVELS]
+    if brotli is not None:
+        encoders += [(f"br {q}", lambda q=q: BrotliEncoder(q)) for q in BROTLI_QUALITIES]
+
+    results = []
+    for rows in args.rows:
+        with engine.connect() as conn:
+            body = orjson.dumps([r._asdict() for r in conn.execute(projects_query().limit(rows))])
+        results.append([rows, "identity", f"{len(body) / 1024:.0f}", "-", "-", "-"])
+        for label, encoder in encoders:
+            ms, compressed = cpu_ms(lambda: encoder().finish(body), args.repeat)
+            results.append([
+                rows, label, f"{len(compressed) / 1024:.0f}",
+                f"{100 * (1 - len(compressed) / len(body)):.1f}%",
+                f"{ms:.1f}", f"{len(body) / 2**20 / (ms / 1000):.0f}" if ms else "-",
+            ])
+    table(["rows", "encoding", "KiB", "saved", "CPU ms", "MiB/s"], results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Deleting a mentor with 500 students and 2,000 projects: the old statement sequence vs one cascading DELETE.
+
+"before" replays what delete_mentor did before the foreign keys, with them switched off (delete
+projects, unassign students, load and delete the mentor; messages were left behind), "after" is
+DELETE /admin/mentors/{id}:
+    python -m bench.delete_mentor [--rounds 3]
+"""
+import argparse
+import statistics
+import time
+from bench.common import use_database, seed, table
+
+FOREIGN_KEYS = {
+    "sqlite": "PRAGMA foreign_keys={}",
+    "mysql": "SET SESSION foreign_key_checks={}",
+}
+STUDENTS_PER_MENTOR = 500
+PROJECTS_PER_STUDENT = 4
+MESSAGES_PER_PROJECT = 5
+
+
+def delete_before(session, mentor_id):
+    from app.models import Mentor, Project, Student
+
+    session.query(Project).filter(Project.mentor_id == mentor_id).delete(synchronize_session=False)
+    session.query(Student).filter(Student.mentor_id == mentor_id).update({"mentor_id": None})
+    mentor = session.query(Mentor).filter(Mentor.mentor_id == mentor_id).first()
+    session.delete(mentor)
+    session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.delete_mentor")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    print("database:", use_database())
+    seed(2 * args.rounds, STUDENTS_PER_MENTOR, PROJECTS_PER_STUDENT, MESSAGES_PER_PROJECT)
+
+    from sqlalchemy import event
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import Session
+    from app.database import engine, async_engine
+    from app.main import app
+
+    statements = []
+    for e in [engine] + ([async_engine.sync_engine] if async_engine is not None else []):
+        event.listen(e, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    results = {"before": [], "after": []}
+    counts = {}
+    with TestClient(app) as client:
+        for n in range(args.rounds):
+            for label, mentor_id in (("before", 2 * n + 1), ("after", 2 * n + 2)):
+                if label == "before":
+                    with engine.connect() as conn:
+                        foreign_keys = FOREIGN_KEYS[conn.dialect.name]
+                        conn.exec_driver_sql(foreign_keys.format(0))
+                        conn.commit()
+                        statements.clear()
+                        start = time.perf_counter()
+                        with Session(bind=conn) as session:
+                            delete_before(session, mentor_id)
+                        elapsed = time.perf_counter() - start
+                        conn.exec_driver_sql(foreign_keys.format(1))
+                else:
+                    statements.clear()
+                    start = time.perf_counter()
+                    client.delete(f"/admin/mentors/{mentor_id}").raise_for_status()
+                    elapsed = time.perf_counter() - start
+                results[label].append(elapsed * 1000)
+                counts[label] = len(statements)
+
+    with engine.connect() as conn:
+        orphans = conn.exec_driver_sql(
+            "SELECT COUNT(*) FROM messages WHERE project_id NOT IN (SELECT id FROM projects)"
+        ).scalar()
+
+    table(
+        ["path", "median ms", "statements"],
+        [[label, f"{statistics.median(ms):.1f}", counts[label]] for label, ms in results.items()],
+    )
+    print(f"orphaned messages left by 'before': {orphans}")
+
+
+if __name__ == "__main__":
+    main()
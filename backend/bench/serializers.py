@@ -0,0 +1,57 @@
+"""Serializing a 10k-row admin project list: FastAPI's jsonable_encoder path vs response models + orjson.
+
+Rows come from the real projects_query against a seeded database; each path starts from those rows
+and ends with the response body bytes:
+    python -m bench.serializers [--rows 10000]
+"""
+import argparse
+from bench.common import use_database, seed, timed, table
+
+STUDENTS_PER_MENTOR = 50
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.serializers")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    print("database:", use_database())
+    seed(max(args.rows // STUDENTS_PER_MENTOR, 1), STUDENTS_PER_MENTOR, projects_per_student=1)
+
+    from pydantic import TypeAdapter
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from app.database import engine
+    from app.routers.admin import projects_query
+    from app.schemas import AdminProjectOut
+
+    with engine.connect() as conn:
+        rows = conn.execute(projects_query().limit(args.rows)).all()
+    adapter = TypeAdapter(list[AdminProjectOut])
+
+    paths = {
+        # Before: handlers built dicts and FastAPI reflected over them
+        "dicts + jsonable_encoder + JSONResponse":
+            lambda: JSONResponse(jsonable_encoder([row._asdict() for row in rows])).body,
+        # What FastAPI does for a response_model: validate, dump to JSON-able data, render
+        "response_model + JSONResponse":
+            lambda: JSONResponse(adapter.dump_python(adapter.validate_python(rows), mode="json")).body,
+        "response_model + ORJSONResponse":
+            lambda: ORJSONResponse(adapter.dump_python(adapter.validate_python(rows), mode="json")).body,
+        "pydantic dump_json (floor)":
+            lambda: adapter.dump_json(adapter.validate_python(rows)),
+    }
+
+    results = []
+    for label, serialize in paths.items():
+        ms, body = timed(serialize, args.repeat)
+        results.append([label, f"{ms:.1f}", f"{len(body) / 1024:.0f}"])
+    baseline = float(results[0][1])
+    for row in results:
+        row.append(f"{baseline / float(row[1]):.1f}x")
+    table(["path", "median ms", "KiB", "speedup"], results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Load test for the chat push channel: 5k idle WebSocket clients on one uvicorn worker.
+
+Opens the clients spread over --projects project chats, samples the worker's RSS with all of them
+idle, then posts one message to every project and measures how long each client waits for it.
+All clients run in this one process, which shares the machine with the worker; at 5k clients it
+is usually the bottleneck for the fan-out latency:
+    python -m bench.ws_clients [--clients 5000] [--projects 100]
+"""
+import argparse
+import asyncio
+import resource
+import statistics
+import time
+import httpx
+import websockets
+from bench.async_modes import serve
+from bench.common import use_database, seed, table
+
+STUDENTS_PER_MENTOR = 10
+
+
+def rss_mib(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def run(port, pid, clients, projects, connect_concurrency):
+    base = f"127.0.0.1:{port}"
+    received = {}
+    ready = asyncio.Event()
+    connected = 0
+    gate = asyncio.Semaphore(connect_concurrency)
+    sent_at = {}
+
+    async def client(n):
+        nonlocal connected
+        project_id = n % projects + 1
+        async with gate:
+            ws = await websockets.connect(f"ws://{base}/messages/project/{project_id}/ws", open_timeout=60)
+        connected += 1
+        try:
+            await ready.wait()
+            await ws.recv()
+            received[n] = time.perf_counter() - sent_at[project_id]
+        finally:
+            await ws.close()
+
+    rss_before = rss_mib(pid)
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(client(n)) for n in range(clients)]
+    while connected < clients:
+        if any(t.done() and t.exception() for t in tasks):
+            raise next(t.exception() for t in tasks if t.done() and t.exception())
+        await asyncio.sleep(0.05)
+    connect_seconds = time.perf_counter() - start
+    await asyncio.sleep(1)
+    rss_idle = rss_mib(pid)
+
+    async with httpx.AsyncClient(base_url=f"http://{base}", timeout=60) as http:
+        realtime = (await http.get("/system/realtime")).json()
+        ready.set()
+
+        async def post(project_id):
+            sent_at[project_id] = time.perf_counter()
+            response = await http.post("/messages/", json={
+                "project_id": project_id, "sender_type": "mentor", "sender_id": 1,
+                "message_text": "load test",
+            })
+            response.raise_for_status()
+
+        await asyncio.gather(*(post(p) for p in range(1, projects + 1)))
+        await asyncio.wait_for(asyncio.gather(*tasks), 120)
+
+    latencies = sorted(received.values())
+    return {
+        "connect_seconds": connect_seconds,
+        "rss_before": rss_before,
+        "rss_idle": rss_idle,
+        "subscribers": realtime["subscribers"],
+        "received": len(latencies),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.ws_clients")
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--connect-concurrency", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8791)
+    args = parser.parse_args()
+
+    # Both ends of every connection live on this machine
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, min(hard, 4 * args.clients + 1024)), hard))
+
+    print("database:", use_database())
+    seed(max(args.projects // STUDENTS_PER_MENTOR, 1), STUDENTS_PER_MENTOR, projects_per_student=1)
+
+    server = serve("1", args.port)
+    try:
+        result = asyncio.run(run(args.port, server.pid, args.clients, args.projects, args.connect_concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+
+    table(["metric", "value"], [
+        ["clients connected", result["subscribers"]],
+        ["connect time (s)", f"{result['connect_seconds']:.1f}"],
+        ["worker RSS before (MiB)", f"{result['rss_before']:.0f}"],
+        ["worker RSS idle (MiB)", f"{result['rss_idle']:.0f}"],
+        ["per idle client (KiB)",
+         f"{(result['rss_idle'] - result['rss_before']) * 1024 / max(result['subscribers'], 1):.1f}"],
+        ["messages received", result["received"]],
+        ["fan-out p50 (ms)", f"{result['p50_ms']:.0f}"],
+        ["fan-out p99 (ms)", f"{result['p99_ms']:.0f}"],
+        ["fan-out max (ms)", f"{result['max_ms']:.0f}"],
+    ])
+
+
+if __name__ == "__main__":
+    main()
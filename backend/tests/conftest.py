@@ -0,0 +1,49 @@
+import os
+import tempfile
+
+# The app reads its settings at import time, so point it at a throwaway SQLite file first
+DB_DIR = tempfile.mkdtemp(prefix="pmms-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'test.db')}"
+os.environ["DB_SCHEMA_MODE"] = "upgrade"
+os.environ["CACHE_URL"] = "memory://"
+os.environ.pop("DB_REPLICA_URLS", None)
+os.environ.pop("BROKER_URL", None)
+
+import pytest
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from app.database import engine, async_engine
+from app.main import app
+from bench.common import seed
+
+MENTORS = 20
+STUDENTS_PER_MENTOR = 25
+PROJECTS_PER_STUDENT = 2
+MESSAGES_PER_PROJECT = 20
+
+
+@pytest.fixture(scope="session")
+def seeded():
+    seed(MENTORS, STUDENTS_PER_MENTOR, PROJECTS_PER_STUDENT, MESSAGES_PER_PROJECT)
+
+
+@pytest.fixture(scope="session")
+def client(seeded):
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def queries():
+    """Every statement sent to the database while the test runs, as (sql, parameters)."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+    for e in engines:
+        event.listen(e, "before_cursor_execute", record)
+    yield statements
+    for e in engines:
+        event.remove(e, "before_cursor_execute", record)
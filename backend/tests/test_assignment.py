@@ -0,0 +1,53 @@
+"""Auto-assignment reports only what it wrote, and department narrows the mentors."""
+import asyncio
+from sqlalchemy import delete, insert, select, update
+from app import assignment
+from app.database import async_engine, engine, open_session
+from app.models import Mentor, Student
+
+
+def add_unassigned(*student_ids):
+    with engine.begin() as conn:
+        conn.execute(delete(Student).where(Student.student_id.in_(student_ids)))
+        conn.execute(insert(Student), [
+            {"student_id": s, "name": f"Unassigned {s}", "prn": f"UN{s}", "email": f"un{s}@x", "password": "x"}
+            for s in student_ids
+        ])
+
+
+def test_commit_leaves_out_students_assigned_since_the_plan(seeded):
+    students = [90_001, 90_002, 90_003]
+    add_unassigned(*students)
+
+    async def run():
+        db = open_session()
+        try:
+            _, planned, _ = await assignment.plan(db, student_ids=students)
+            # Someone assigns one of them by hand before the plan is written
+            with engine.begin() as conn:
+                conn.execute(update(Student).where(Student.student_id == 90_002).values(mentor_id=1))
+            return planned, await assignment.commit(db, planned)
+        finally:
+            await db.close()
+            if async_engine is not None:
+                await async_engine.dispose()
+
+    planned, made = asyncio.run(run())
+
+    assert [s for s, _ in planned] == students
+    assert made == [(s, m) for s, m in planned if s != 90_002]
+    with engine.connect() as conn:
+        assert conn.scalar(select(Student.mentor_id).where(Student.student_id == 90_002)) == 1
+
+
+def test_department_spreads_every_unassigned_student_over_its_mentors(client):
+    students = [90_011, 90_012, 90_013, 90_014]
+    add_unassigned(*students)
+    with engine.connect() as conn:
+        cs_mentors = set(conn.scalars(select(Mentor.mentor_id).where(Mentor.department == "CS")))
+
+    result = client.post("/admin/auto-assign", json={"department": "CS", "student_ids": students}).json()
+
+    assert sorted(a["student_id"] for a in result["assignments"]) == students
+    assert {a["mentor_id"] for a in result["assignments"]} <= cs_mentors
+    assert {load["mentor_id"] for load in result["loads"]} == cs_mentors
@@ -0,0 +1,51 @@
+"""Bulk endpoints: each item succeeds or fails on its own."""
+
+
+def test_bulk_status_reports_invalid_items_and_applies_the_rest(client):
+    before = {p["id"]: p for p in client.get("/projects/student/6").json()}
+    response = client.put("/faculty/projects/bulk-status", json={"items": [
+        {"project_id": 11, "status": "In Progress", "progress_percentage": 30},
+        "not an item",
+        {"project_id": 12, "status": "In Progress", "progress_percentage": "lots"},
+        {"project_id": 13, "status": "In Progress", "progress_percentage": 150},
+        {"project_id": 14},
+        {"project_id": 999_999, "status": "Completed"},
+        {"project_id": 15, "status": "Completed", "mentor_feedback": "done"},
+    ]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 2
+    assert [(r["id"], r["ok"]) for r in body["results"]] == [
+        (11, True), (None, False), (12, False), (13, False), (14, False), (999_999, False), (15, True),
+    ]
+    errors = [r["error"] for r in body["results"]]
+    assert "progress_percentage" in errors[2]
+    assert "less than or equal to 100" in errors[3]
+    assert "status" in errors[4]
+    assert errors[5] == "Project not found"
+
+    projects = {p["id"]: p for p in client.get("/projects/student/6").json()}
+    assert (projects[11]["status"], projects[11]["progress_percentage"]) == ("In Progress", 30)
+    assert projects[12] == before[12]
+
+
+def test_bulk_assign_reports_invalid_items_and_applies_the_rest(client):
+    response = client.put("/admin/assign-mentor/bulk", json={"items": [
+        {"student_id": 30, "mentor_id": 2},
+        {"student_id": "thirty-one", "mentor_id": 2},
+        {"student_id": 32, "mentor_id": 999_999},
+        42,
+        {"student_id": 33, "mentor_id": 2},
+    ]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 2
+    assert [(r["id"], r["ok"]) for r in body["results"]] == [
+        (30, True), (None, False), (32, False), (None, False), (33, True),
+    ]
+
+
+def test_bulk_items_must_be_a_list(client):
+    assert client.put("/faculty/projects/bulk-status", json={"items": {"project_id": 1}}).status_code == 422
@@ -0,0 +1,144 @@
+"""Cache fills come from the primary and never outlive an invalidation that raced them."""
+import asyncio
+import time
+import pytest
+from starlette.requests import Request
+from starlette.responses import Response
+from app import database
+from app.cache import MISSING, MemoryBackend, SharedCache, TTLCache, cached_page
+
+
+class FakeSession:
+    def __init__(self, name, read_only=False):
+        self.name = name
+        self.info = {"read_only": read_only}
+
+    async def close(self):
+        pass
+
+
+def make_request(path="/faculty/", sticky=False):
+    headers = []
+    if sticky:
+        headers.append((b"cookie", f"{database.STICKY_COOKIE}={time.time() + 60}".encode()))
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": headers})
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    """A replica is configured; sessions opened by the cache go to the "primary"."""
+    monkeypatch.setattr(database, "replica_engines", ["replica"])
+    monkeypatch.setattr(database, "open_session", lambda read_only=False: FakeSession("primary"))
+
+
+def test_cached_page_fills_from_the_primary(replicas):
+    cache = TTLCache("test", ttl=60, maxsize=10)
+    seen = []
+
+    async def load(session):
+        seen.append(session.name)
+        return [session.name]
+
+    rows = asyncio.run(cached_page(cache, make_request(), Response(), load, FakeSession("replica", True)))
+
+    assert seen == ["primary"]
+    assert rows == ["primary"]
+    assert cache.get(("/faculty/", ())) == (["primary"], {})
+
+
+def test_cached_page_drops_a_load_raced_by_a_clear(replicas):
+    cache = TTLCache("test", ttl=60, maxsize=10)
+
+    async def load(session):
+        # A write commits and clears the cache while this (older) read is in flight
+        cache.clear()
+        return ["stale"]
+
+    rows = asyncio.run(cached_page(cache, make_request(), Response(), load, FakeSession("replica", True)))
+
+    assert rows == ["stale"]
+    assert cache.get(("/faculty/", ())) is MISSING
+
+
+def test_cached_page_skips_the_cache_for_recent_writers(replicas):
+    cache = TTLCache("test", ttl=60, maxsize=10)
+    cache.set(("/faculty/", ()), (["cached"], {}))
+
+    async def load(session):
+        return ["fresh"]
+
+    rows = asyncio.run(cached_page(cache, make_request(sticky=True), Response(), load, FakeSession("primary")))
+
+    assert rows == ["fresh"]
+
+
+def shared():
+    return SharedCache(MemoryBackend(), ttl=60, local_ttl=60, local_size=10)
+
+
+def test_shared_cache_fills_from_the_primary(replicas):
+    cache = shared()
+    seen = []
+
+    async def load(session):
+        seen.append(session.name)
+        return {"from": session.name}, ["project:1"]
+
+    async def run():
+        first = await cache.get_or_load("/projects/1", load, FakeSession("replica", True))
+        second = await cache.get_or_load("/projects/1", load, FakeSession("replica", True))
+        return first, second
+
+    assert asyncio.run(run()) == ({"from": "primary"}, {"from": "primary"})
+    assert seen == ["primary"]
+
+
+def test_shared_cache_drops_a_load_raced_by_an_invalidation(replicas):
+    cache = shared()
+
+    async def run():
+        async def stale_load(session):
+            await cache.invalidate("project:1")
+            return {"title": "old"}, ["project:1"]
+
+        async def load(session):
+            return {"title": "new"}, ["project:1"]
+
+        first = await cache.get_or_load("/projects/1", stale_load, FakeSession("primary"))
+        second = await cache.get_or_load("/projects/1", load, FakeSession("primary"))
+        return first, second
+
+    assert asyncio.run(run()) == ({"title": "old"}, {"title": "new"})
+
+
+def test_shared_cache_skips_the_local_tier_for_recent_writers(replicas):
+    cache = shared()
+
+    async def run():
+        async def load(session):
+            return {"title": "new"}, ["project:1"]
+
+        # This replica has not yet seen the invalidation another replica published
+        cache.local.set("/projects/1", ({"title": "old"}, {"project:1"}))
+        return await cache.get_or_load("/projects/1", load, FakeSession("primary"), sticky=True)
+
+    assert asyncio.run(run()) == {"title": "new"}
+
+
+def test_directory_invalidations_reach_every_process():
+    backend = MemoryBackend()
+    processes = [SharedCache(backend, ttl=60, local_ttl=60, local_size=10) for _ in range(2)]
+    directories = [TTLCache("mentors", ttl=60, maxsize=10) for _ in processes]
+    for process, directory in zip(processes, directories):
+        process.clear_on("mentors", directory)
+        directory.set(("/faculty/", ()), (["old"], {}))
+
+    async def run():
+        for process in processes:
+            await process.start()
+        # The mentor write lands on the first process only
+        await processes[0].invalidate("mentors", "mentor:3")
+
+    asyncio.run(run())
+
+    assert [d.get(("/faculty/", ())) for d in directories] == [MISSING, MISSING]
@@ -0,0 +1,51 @@
+"""ETag revalidation of the cached project lists."""
+from app.cache import shared_cache
+
+
+def revalidate(client, url, etag):
+    return client.get(url, headers={"If-None-Match": etag})
+
+
+def test_304_from_a_cold_cache_costs_one_query(client, queries):
+    client.portal.call(shared_cache.invalidate, "mentor:15")
+    etag = client.get("/faculty/projects/15").headers["ETag"]
+    client.portal.call(shared_cache.invalidate, "mentor:15")
+    queries.clear()
+
+    response = revalidate(client, "/faculty/projects/15", etag)
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert len(queries) == 1
+
+
+def test_304_from_a_warm_cache_costs_no_query(client, queries):
+    etag = client.get("/projects/student/360").headers["ETag"]
+    queries.clear()
+
+    assert revalidate(client, "/projects/student/360", etag).status_code == 304
+    assert queries == []
+
+
+def test_write_in_the_same_second_changes_the_etag(client):
+    first = client.get("/faculty/projects/16")
+    project = first.json()[0]
+
+    client.put(f"/faculty/projects/{project['id']}/status", json={
+        "status": "Needs Changes", "progress_percentage": project["progress_percentage"]
+    }).raise_for_status()
+    response = revalidate(client, "/faculty/projects/16", first.headers["ETag"])
+
+    assert response.status_code == 200
+    assert {p["id"]: p["status"] for p in response.json()}[project["id"]] == "Needs Changes"
+
+
+def test_renamed_student_changes_the_mentor_list_etag(client):
+    # Mentor 16's students are 376-400
+    first = client.get("/faculty/projects/16")
+
+    client.put("/admin/students/376", json={"name": "Renamed Student"}).raise_for_status()
+    response = revalidate(client, "/faculty/projects/16", first.headers["ETag"])
+
+    assert response.status_code == 200
+    assert "Renamed Student" in {p["student_name"] for p in response.json()}
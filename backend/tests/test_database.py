@@ -0,0 +1,39 @@
+"""The DB_ASYNC=0 session wrapper under more concurrent requests than pooled connections."""
+import asyncio
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.database import ThreadedSession, engine
+
+POOL_SIZE = 2
+REQUESTS = 60
+
+
+def test_threaded_sessions_beyond_the_pool_size_all_finish():
+    # A one-second checkout timeout: a session stuck waiting on a connection fails the test
+    small = create_engine(engine.url, pool_size=POOL_SIZE, max_overflow=0, pool_timeout=1)
+    make_session = sessionmaker(bind=small)
+    peak = 0
+
+    async def request(slots):
+        nonlocal peak
+        db = ThreadedSession(make_session(), slots)
+        try:
+            assert await db.scalar(text("SELECT 1")) == 1
+            peak = max(peak, small.pool.checkedout())
+            await asyncio.sleep(0.01)
+            await db.commit()
+        finally:
+            await db.close()
+
+    async def run():
+        # More requests than threadpool threads (40), all started at once
+        slots = asyncio.Semaphore(POOL_SIZE)
+        return await asyncio.gather(*(request(slots) for _ in range(REQUESTS)), return_exceptions=True)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        small.dispose()
+
+    assert [r for r in results if r is not None] == []
+    assert peak <= POOL_SIZE
@@ -0,0 +1,49 @@
+"""Exports stream in chunks: peak memory stays flat however many rows the export has."""
+import asyncio
+import tracemalloc
+import pytest
+from sqlalchemy import insert
+from app.database import engine, async_engine
+from app.models import Message
+from app.routers.admin import export_messages
+
+EXTRA_MESSAGES = 100_000
+MESSAGE_TEXT = "x" * 200
+# The body is ~30 MiB; a chunk of EXPORT_CHUNK rows is well under one
+MEMORY_CEILING = 8 * 2**20
+
+
+@pytest.fixture(scope="module")
+def large_chat(seeded):
+    with engine.begin() as conn:
+        conn.execute(insert(Message), [
+            {"project_id": 1, "sender_type": "student", "sender_id": 1, "message_text": MESSAGE_TEXT}
+            for _ in range(EXTRA_MESSAGES)
+        ])
+
+
+async def drain(response):
+    size = 0
+    try:
+        async for chunk in response.body_iterator:
+            size += len(chunk)
+    finally:
+        # aiosqlite connections pooled on this loop would outlive it and keep pytest from exiting
+        if async_engine is not None:
+            await async_engine.dispose()
+    return size
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_export_memory_stays_under_ceiling(large_chat, fmt):
+    response = asyncio.run(export_messages(fmt=fmt, project_id=None))
+
+    tracemalloc.start()
+    try:
+        size = asyncio.run(drain(response))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert size > EXTRA_MESSAGES * len(MESSAGE_TEXT)
+    assert peak < MEMORY_CEILING, f"{fmt} export peaked at {peak / 2**20:.1f} MiB for {size / 2**20:.1f} MiB"
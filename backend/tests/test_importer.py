@@ -0,0 +1,30 @@
+"""Student CSV import reports rows that do not fit the table instead of failing the batch."""
+from sqlalchemy import func, select
+from app.database import engine
+from app.models import Student
+
+
+def test_overlong_and_missing_fields_are_row_errors(client):
+    csv = "\n".join([
+        "name,prn,email,password",
+        "Fits,IMP-1,imp1@example.edu,pw",
+        f"{'N' * 101},IMP-2,imp2@example.edu,pw",
+        f"Long PRN,{'P' * 51},imp3@example.edu,pw",
+        "No Password,IMP-4,imp4@example.edu,",
+        "Also Fits,IMP-5,imp5@example.edu,pw",
+    ])
+
+    response = client.post("/admin/students/import", files={"file": ("students.csv", csv.encode(), "text/csv")})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "inserted": 2,
+        "failed": 3,
+        "errors": [
+            {"row": 3, "errors": ["name is longer than 100 characters"]},
+            {"row": 4, "errors": ["prn is longer than 50 characters"]},
+            {"row": 5, "errors": ["password is required"]},
+        ],
+    }
+    with engine.connect() as conn:
+        assert conn.scalar(select(func.count()).where(Student.prn.in_(["IMP-1", "IMP-5"]))) == 2
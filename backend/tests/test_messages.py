@@ -0,0 +1,54 @@
+"""Sending chat messages."""
+from sqlalchemy import func, select
+from app.database import engine
+from app.models import Message
+
+
+def test_message_to_a_missing_project_is_a_404(client):
+    with engine.connect() as conn:
+        before = conn.scalar(select(func.count(Message.message_id)))
+
+    response = client.post("/messages/", json={
+        "project_id": 999_999, "sender_type": "student", "sender_id": 1, "message_text": "lost",
+    })
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Project not found"}
+    with engine.connect() as conn:
+        assert conn.scalar(select(func.count(Message.message_id))) == before
+
+
+def test_message_counts_as_unread_for_the_other_side(client):
+    def unread():
+        counts = client.get("/messages/unread", params={"reader_type": "mentor", "reader_id": 1}).json()
+        return {c["project_id"]: c["unread_count"] for c in counts}.get(1, 0)
+
+    before = unread()
+    response = client.post("/messages/", json={
+        "project_id": 1, "sender_type": "student", "sender_id": 1, "message_text": "hello",
+    })
+
+    assert response.status_code == 200
+    assert unread() == before + 1
+
+
+def test_chat_history_pages_forwards_and_backwards(client):
+    with engine.connect() as conn:
+        ids = list(conn.scalars(
+            select(Message.message_id).where(Message.project_id == 2).order_by(Message.message_id)
+        ))
+
+    first = client.get("/messages/project/2", params={"limit": 5})
+    assert [m["message_id"] for m in first.json()] == ids[:5]
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get("/messages/project/2", params={"limit": 5, "cursor": cursor})
+    assert [m["message_id"] for m in second.json()] == ids[5:10]
+
+    newer = client.get("/messages/project/2", params={"after_message_id": ids[-3]})
+    assert [m["message_id"] for m in newer.json()] == ids[-2:]
+    assert "X-Next-Cursor" not in newer.headers
+
+    # Scrolling back returns the messages just before the oldest one shown, oldest first
+    older = client.get("/messages/project/2", params={"before_message_id": ids[10], "limit": 4})
+    assert [m["message_id"] for m in older.json()] == ids[6:10]
+    assert "X-Next-Cursor" in older.headers
@@ -0,0 +1,160 @@
+"""upgrade() from the schema the app shipped with before migrations existed, and from scratch."""
+from sqlalchemy import (
+    Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text, create_engine, event,
+    func, select
+)
+from sqlalchemy import inspect
+from app import migrations
+from app.database import Base, enable_sqlite_foreign_keys
+
+baseline = MetaData()
+Table(
+    "admin", baseline,
+    Column("admin_id", Integer, primary_key=True),
+    Column("username", String(50), unique=True, nullable=False),
+    Column("password", String(255), nullable=False),
+)
+Table(
+    "mentor", baseline,
+    Column("mentor_id", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("email", String(100), unique=True, nullable=False),
+    Column("password", String(255), nullable=False),
+    Column("department", String(100)),
+)
+Table(
+    "student", baseline,
+    Column("student_id", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("prn", String(50), unique=True, nullable=False),
+    Column("email", String(100), unique=True, nullable=False),
+    Column("password", String(255), nullable=False),
+    Column("mentor_id", Integer, ForeignKey("mentor.mentor_id")),
+    Column("github_link", String(255)),
+)
+Table(
+    "projects", baseline,
+    Column("id", Integer, primary_key=True),
+    Column("project_id", String(20), nullable=False),
+    Column("title", String(255), nullable=False),
+    Column("description", Text),
+    Column("student_id", Integer, nullable=False),
+    Column("mentor_id", Integer),
+    Column("status", String(30), nullable=False),
+    Column("progress_percentage", Integer, nullable=False),
+    Column("mentor_feedback", Text),
+    Column("github_link", String(255)),
+    Column("submission_date", DateTime, server_default=func.now()),
+    Column("last_updated", DateTime, server_default=func.now()),
+)
+Table(
+    "messages", baseline,
+    Column("message_id", Integer, primary_key=True),
+    Column("project_id", Integer),
+    Column("sender_type", String(20)),
+    Column("sender_id", Integer),
+    Column("message_text", Text),
+    Column("sent_at", DateTime, server_default=func.now()),
+)
+
+
+def baseline_database(tmp_path):
+    bind = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    baseline.create_all(bind)
+    t = baseline.tables
+    with bind.begin() as conn:
+        conn.execute(t["mentor"].insert(), [
+            {"mentor_id": 1, "name": "M", "email": "m@x", "password": "p", "department": "CS"},
+        ])
+        conn.execute(t["student"].insert(), [
+            {"student_id": 1, "name": "S", "prn": "P1", "email": "s@x", "password": "p", "mentor_id": 1},
+        ])
+        conn.execute(t["projects"].insert(), [
+            {"id": 1, "project_id": "PRJ1", "title": "kept", "student_id": 1, "mentor_id": 1,
+             "status": "Pending", "progress_percentage": 0},
+            # Student deleted before deletes cascaded; its messages only become orphans
+            # once this project is cleaned up
+            {"id": 2, "project_id": "PRJ2", "title": "orphan", "student_id": 99, "mentor_id": 1,
+             "status": "Pending", "progress_percentage": 0},
+            {"id": 3, "project_id": "PRJ3", "title": "lost mentor", "student_id": 1, "mentor_id": 42,
+             "status": "Pending", "progress_percentage": 0},
+        ])
+        conn.execute(t["messages"].insert(), [
+            {"message_id": 1, "project_id": 1, "sender_type": "student", "sender_id": 1, "message_text": "a"},
+            {"message_id": 2, "project_id": 2, "sender_type": "student", "sender_id": 99, "message_text": "b"},
+            {"message_id": 3, "project_id": 77, "sender_type": "mentor", "sender_id": 1, "message_text": "c"},
+            {"message_id": 4, "project_id": None, "sender_type": "mentor", "sender_id": 1, "message_text": "d"},
+        ])
+
+    # The foreign keys added by the migrations are only enforced with the pragma on
+    event.listen(bind, "connect", enable_sqlite_foreign_keys)
+    bind.dispose()
+    return bind
+
+
+def test_upgrade_removes_orphans_of_orphaned_projects(tmp_path):
+    bind = baseline_database(tmp_path)
+    t = baseline.tables
+
+    assert migrations.upgrade(bind) == [version for version, _, _ in migrations.MIGRATIONS]
+    with bind.connect() as conn:
+        assert migrations.current_version(conn) == migrations.head_version()
+        assert conn.execute(select(t["projects"].c.id).order_by(t["projects"].c.id)).scalars().all() == [1, 3]
+        assert conn.execute(select(t["projects"].c.mentor_id).where(t["projects"].c.id == 3)).scalar() is None
+        assert conn.execute(select(t["messages"].c.message_id)).scalars().all() == [1]
+        summaries = conn.exec_driver_sql(
+            "SELECT project_id, message_count FROM conversation_summary"
+        ).all()
+        assert summaries == [(1, 1)]
+    assert migrations.upgrade(bind) == []
+
+
+def test_upgrade_past_summaries_with_orphans_left_by_migration_3(tmp_path, monkeypatch):
+    bind = baseline_database(tmp_path)
+    head = migrations.MIGRATIONS
+    monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in head if m[0] <= 7])
+    migrations.upgrade(bind)
+    # What the old migration 3 left behind: messages of the projects it deleted,
+    # let through by MySQL with foreign_key_checks off
+    with bind.connect() as conn:
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        conn.execute(baseline.tables["messages"].insert(), [
+            {"message_id": 5, "project_id": 2, "sender_type": "student", "sender_id": 99, "message_text": "e"},
+        ])
+        conn.commit()
+    bind.dispose()
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", head)
+    assert migrations.upgrade(bind) == [version for version, _, _ in head if version > 7]
+    with bind.connect() as conn:
+        assert conn.execute(select(baseline.tables["messages"].c.message_id)).scalars().all() == [1]
+
+
+def schema(bind):
+    """Tables, columns, indexes and foreign keys as the database reports them."""
+    inspector = inspect(bind)
+    described = {}
+    for table in inspector.get_table_names():
+        if table == "schema_version":
+            continue
+        described[table] = {
+            "columns": [(c["name"], str(c["type"]), c["nullable"]) for c in inspector.get_columns(table)],
+            "primary_key": inspector.get_pk_constraint(table)["constrained_columns"],
+            "indexes": sorted((ix["name"], tuple(ix["column_names"])) for ix in inspector.get_indexes(table)),
+            "unique": sorted(tuple(u["column_names"]) for u in inspector.get_unique_constraints(table)),
+            "foreign_keys": sorted(
+                (fk["name"], tuple(fk["constrained_columns"]), fk["referred_table"], fk["options"].get("ondelete"))
+                for fk in inspector.get_foreign_keys(table)
+            ),
+        }
+    return described
+
+
+def test_migrations_build_the_schema_the_models_declare(tmp_path):
+    # Fails when a model changes without a migration to match
+    migrated = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    declared = create_engine(f"sqlite:///{tmp_path / 'declared.db'}")
+    migrations.upgrade(migrated)
+    Base.metadata.create_all(declared)
+
+    assert schema(migrated) == schema(declared)
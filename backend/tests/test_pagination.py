@@ -0,0 +1,89 @@
+"""Keyset pages, X-Next-Cursor / X-Total-Count and filters on the admin list endpoints."""
+from sqlalchemy import func, select
+from app.database import engine
+from app.models import Mentor, Project, Student
+from app.pagination import DEFAULT_LIMIT, MAX_LIMIT
+
+
+def all_pages(client, url, params=None, limit=MAX_LIMIT):
+    """Every row of `url`, following X-Next-Cursor; also returns the number of requests."""
+    rows, requests, cursor = [], 0, None
+    while True:
+        response = client.get(url, params={**(params or {}), "limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        rows += response.json()
+        requests += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return rows, requests
+
+
+def test_no_params_returns_the_first_default_page(client):
+    response = client.get("/admin/students")
+
+    assert response.status_code == 200
+    assert len(response.json()) == DEFAULT_LIMIT
+    assert "X-Next-Cursor" in response.headers
+    assert "X-Total-Count" not in response.headers
+
+
+def test_limit_above_the_maximum_is_rejected(client):
+    assert client.get("/admin/students", params={"limit": MAX_LIMIT + 1}).status_code == 422
+    assert client.get("/admin/students", params={"limit": 0}).status_code == 422
+
+
+def test_invalid_cursor_is_a_400(client):
+    response = client.get("/admin/students", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+def test_cursors_walk_every_row_once_in_order(client):
+    with engine.connect() as conn:
+        expected = list(conn.scalars(select(Student.student_id).order_by(Student.student_id)))
+
+    rows, requests = all_pages(client, "/admin/students", limit=137)
+
+    assert [r["student_id"] for r in rows] == expected
+    assert requests == len(expected) // 137 + 1
+
+
+def test_include_total_counts_the_filtered_rows(client):
+    with engine.connect() as conn:
+        total = conn.scalar(select(func.count()).select_from(Student).where(Student.mentor_id == 3))
+
+    response = client.get("/admin/students", params={"mentor_id": 3, "limit": 5, "include_total": "true"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == str(total)
+    assert len(response.json()) == 5
+
+
+def test_descending_sort_pages_match_the_database_order(client):
+    with engine.connect() as conn:
+        expected = list(conn.scalars(
+            select(Student.student_id)
+            .join(Mentor, Student.mentor_id == Mentor.mentor_id)
+            .where(Mentor.department == "IT")
+            .order_by(Student.name.desc(), Student.student_id.desc())
+        ))
+
+    rows, _ = all_pages(client, "/admin/students", {"department": "IT", "sort": "-name"}, limit=7)
+
+    assert [r["student_id"] for r in rows] == expected
+
+
+def test_project_filters_combine(client):
+    with engine.connect() as conn:
+        expected = list(conn.scalars(
+            select(Project.id)
+            .join(Mentor, Project.mentor_id == Mentor.mentor_id)
+            .where(Project.status == "Approved", Mentor.department == "ENTC")
+            .order_by(Project.id)
+        ))
+
+    rows, _ = all_pages(client, "/admin/projects", {"status": "Approved", "department": "ENTC"}, limit=50)
+
+    assert expected
+    assert [r["id"] for r in rows] == expected
+    assert {r["status"] for r in rows} == {"Approved"}
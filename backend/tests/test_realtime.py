@@ -0,0 +1,121 @@
+"""Realtime fan-out: the WebSocket loop, the hub and the Redis listener."""
+import asyncio
+from redis.exceptions import ConnectionError as RedisConnectionError
+from app import pubsub
+from app.cache import MemoryBackend, shared_cache
+from app.realtime import Event, Hub, MemoryBroker, hub, message_topic
+from app.routers.messages import project_messages_ws
+
+
+class FakeWebSocket:
+    """Each receive() runs the next step, then returns its frame; sent text is collected."""
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def receive(self):
+        step = self.steps.pop(0)
+        return await step()
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.sent.append(f"close {code}")
+
+
+def test_event_dequeued_in_the_same_round_as_a_client_frame_is_sent():
+    async def chatter():
+        # Lands in the subscriber queue while the client's frame arrives
+        hub.deliver(message_topic(9001), Event("message", 1, '{"message_id": 1}'))
+        return {"type": "websocket.receive", "text": "ping"}
+
+    async def disconnect():
+        await asyncio.sleep(0.05)
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    websocket = FakeWebSocket([chatter, disconnect])
+    asyncio.run(project_messages_ws(websocket, 9001, None))
+
+    assert websocket.sent == ['{"message_id": 1}']
+
+
+def test_a_crowded_topic_cuts_each_subscriber_off_sooner():
+    crowded = Hub(MemoryBroker(), queue_size=100, topic_buffer=40)
+    subscribers = [crowded.subscribe("busy") for _ in range(4)]
+    quiet = crowded.subscribe("quiet")
+
+    # 4 subscribers share 40 events: each may lag 10, the lone one the full 40
+    for n in range(11):
+        crowded.deliver("busy", Event("message", n, "{}"))
+    for n in range(40):
+        crowded.deliver("quiet", Event("message", n, "{}"))
+
+    assert all(s.queue.get_nowait() is None for s in subscribers)
+    assert quiet.queue.qsize() == 40
+    assert crowded.stats()["dropped"] == 4
+
+
+class DownBroker(MemoryBroker):
+    async def publish(self, topic, event):
+        raise ConnectionError("broker unreachable")
+
+
+class DownBackend(MemoryBackend):
+    async def invalidate(self, tags):
+        raise ConnectionError("cache unreachable")
+
+    async def publish(self, channel, message):
+        raise ConnectionError("cache unreachable")
+
+
+def test_committed_writes_succeed_while_the_broker_is_down(client, monkeypatch):
+    monkeypatch.setattr(hub, "broker", DownBroker())
+    monkeypatch.setattr(shared_cache, "backend", DownBackend())
+    errors = hub.publish_errors
+
+    sent = client.post("/messages/", json={
+        "project_id": 1, "sender_type": "mentor", "sender_id": 1, "message_text": "still saved",
+    })
+    status = client.put("/faculty/projects/1/status", json={"status": "In Progress"})
+
+    assert sent.status_code == 200
+    assert status.status_code == 200
+    assert hub.publish_errors == errors + 2
+    realtime = client.get("/system/realtime").json()
+    assert realtime["publish_errors"] == errors + 2
+    assert realtime["invalidate_errors"] >= 2
+
+
+class FakePubSub:
+    def __init__(self, fail_connects=0):
+        self.fail_connects = fail_connects
+        self.connects = 0
+
+    async def connect(self):
+        self.connects += 1
+        if self.connects <= self.fail_connects:
+            raise OSError("connection refused")
+
+
+def test_listener_skips_bad_messages_and_reconnects(monkeypatch):
+    monkeypatch.setattr(pubsub, "RECONNECT_MAX_SECONDS", 0)
+    listener = pubsub.Listener(None, "pmms:events", None)
+    fake = FakePubSub(fail_connects=1)
+
+    async def run():
+        await listener.on_error(ValueError("bad payload"), fake)
+        assert fake.connects == 0
+        await listener.on_error(RedisConnectionError("reset by peer"), fake)
+        assert not listener.connected
+        await listener.on_error(RedisConnectionError("reset by peer"), fake)
+
+    asyncio.run(run())
+
+    assert fake.connects == 2
+    assert listener.health()["connected"]
+    assert listener.health()["errors"] == 3
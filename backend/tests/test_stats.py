@@ -0,0 +1,64 @@
+"""project_stats stays equal to a fresh aggregate through project writes and cascading deletes."""
+from sqlalchemy import select
+from app import stats
+from app.database import engine
+from app.models import Project
+
+
+def problems():
+    with engine.connect() as conn:
+        return stats.check(conn)
+
+
+def new_mentor(client, name):
+    response = client.post("/admin/mentors", json={
+        "name": name, "email": f"{name}@example.edu", "password": "pw", "department": "Stats",
+    })
+    assert response.status_code == 200
+    return response.json()["mentor_id"]
+
+
+def new_student(client, name, mentor_id):
+    response = client.post("/admin/students", json={
+        "name": name, "prn": f"PRN-{name}", "email": f"{name}@example.edu", "password": "pw",
+        "mentor_id": mentor_id,
+    })
+    assert response.status_code == 200
+    return response.json()["student_id"]
+
+
+def new_project(client, student_id, mentor_id, title):
+    response = client.post("/projects/", json={
+        "title": title, "description": "counted", "student_id": student_id, "mentor_id": mentor_id,
+    })
+    assert response.status_code == 200
+    with engine.connect() as conn:
+        return conn.scalar(select(Project.id).where(Project.title == title))
+
+
+def test_counters_follow_creates_status_changes_and_student_deletes(client):
+    mentor_id = new_mentor(client, "stats-mentor-a")
+    student_id = new_student(client, "stats-student-a", mentor_id)
+    first = new_project(client, student_id, mentor_id, "stats project a1")
+    new_project(client, student_id, mentor_id, "stats project a2")
+    assert problems() == []
+
+    response = client.put(f"/faculty/projects/{first}/status", json={
+        "status": "In Progress", "progress_percentage": 40,
+    })
+    assert response.status_code == 200
+    assert problems() == []
+
+    assert client.delete(f"/admin/students/{student_id}").status_code == 200
+    assert problems() == []
+
+
+def test_counters_follow_mentor_deletes(client):
+    mentor_id = new_mentor(client, "stats-mentor-b")
+    student_id = new_student(client, "stats-student-b", mentor_id)
+    project = new_project(client, student_id, mentor_id, "stats project b1")
+    client.put(f"/faculty/projects/{project}/status", json={"status": "Completed", "progress_percentage": 100})
+    assert problems() == []
+
+    assert client.delete(f"/admin/mentors/{mentor_id}").status_code == 200
+    assert problems() == []
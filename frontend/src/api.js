@@ -4,4 +4,24 @@ const api = axios.create({
   baseURL: "/api",
 });
 
+// Largest page the list endpoints serve (MAX_LIMIT in backend/app/pagination.py)
+const PAGE_LIMIT = 500;
+
+// List endpoints answer one page at a time and put the next page's cursor in
+// X-Next-Cursor; this follows it and returns the last response with every row in `data`
+export const getAllPages = async (url, config = {}) => {
+  const rows = [];
+  let cursor = null;
+  let response;
+  do {
+    response = await api.get(url, {
+      ...config,
+      params: { ...config.params, limit: PAGE_LIMIT, ...(cursor ? { cursor } : {}) },
+    });
+    rows.push(...response.data);
+    cursor = response.headers["x-next-cursor"];
+  } while (cursor);
+  return { ...response, data: rows };
+};
+
 export default api;
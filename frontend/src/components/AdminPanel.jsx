@@ -7,7 +7,7 @@ import MoreVert from "@mui/icons-material/MoreVert";
 import Navbar from "./Navbar";
 
 
-import api from "../api";   
+import api, { getAllPages } from "../api";   
 
 import {
   Sheet,
@@ -78,9 +78,9 @@ const AdminPanel = () => {
     setError("");
     try {
       const [studentsRes, mentorsRes, projectsRes] = await Promise.all([
-        api.get("/admin/students"),
-        api.get("/admin/mentors"),
-        api.get("/admin/projects")
+        getAllPages("/admin/students"),
+        getAllPages("/admin/mentors"),
+        getAllPages("/admin/projects")
       ]);
       
       const sortedStudents = studentsRes.data.sort((a, b) => a.student_id - b.student_id);
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
-import api from "../api";   
+import { getAllPages } from "../api";   
 import Navbar from "./Navbar";
 
 const Dashboard = () => {
@@ -23,7 +23,7 @@ const Dashboard = () => {
     setLoading(true);
     setError(null);
     try {
-      const response = await api.get("/student/student");
+      const response = await getAllPages("/student/student");
       setStudentsWithMentors(response.data);
       setLoading(false);
     } catch (err) {
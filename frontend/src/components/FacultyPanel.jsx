@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
-import api from "../api";   
+import api, { getAllPages } from "../api";   
 import Navbar from "./Navbar";
 import Modal from '@mui/joy/Modal';
 import ModalDialog from '@mui/joy/ModalDialog';
@@ -211,7 +211,7 @@ const FacultyPanel = () => {
 
   const fetchFaculty = async () => {
     try {
-      const response = await api.get("/faculty");
+      const response = await getAllPages("/faculty");
       setFaculty(response.data);
     } catch (error) {
       alert(error.message);
@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { Box, Typography, Input, Button, Avatar, Badge, CircularProgress } from '@mui/joy';
-import api from "../api";   
+import api, { getAllPages } from "../api";   
 import SendIcon from '@mui/icons-material/Send';
 import ChatBubbleOutlineIcon from '@mui/icons-material/ChatBubbleOutline';
 
@@ -36,7 +36,7 @@ const MessageChat = ({ projectId, userId, userType, embedded = false }) => {
     
     const fetchUnreadCount = async () => {
       try {
-        const response = await api.get(`/messages/project/${projectId}`);
+        const response = await getAllPages(`/messages/project/${projectId}`);
         const unread = response.data.filter(
           msg => !msg.is_read && msg.sender_type !== userType
         ).length;
@@ -60,7 +60,7 @@ const MessageChat = ({ projectId, userId, userType, embedded = false }) => {
   const fetchMessages = async () => {
     setLoading(true);
     try {
-      const response = await api.get(`/messages/project/${projectId}`);
+      const response = await getAllPages(`/messages/project/${projectId}`);
       setMessages(response.data);
       
       const unread = response.data.filter(
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
-import api from "../api";   
+import api, { getAllPages } from "../api";   
 import Button from '@mui/joy/Button';
 import Modal from '@mui/joy/Modal';
 import ModalDialog from '@mui/joy/ModalDialog';
@@ -179,7 +179,7 @@ const StudentPanel = () => {
 
   const fetchStudents = async () => {
     try {
-      const response = await api.get("/student/student");
+      const response = await getAllPages("/student/student");
       setStudents(response.data);
     } catch (err) {
       alert(err.message);
@@ -189,7 +189,7 @@ const StudentPanel = () => {
 
   const fetchMentors = async () => {
     try {
-      const response = await api.get("/faculty");
+      const response = await getAllPages("/faculty");
       setMentors(response.data);
     } catch (err) {
       console.error("Error fetching mentors:", err);